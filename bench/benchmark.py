@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# End-to-End-Benchmark gegen den lokalen Steam-Mock (bench/mock_steam.py), komplett offline.
+# Misst Seiten/s, Blocks/s, p50/p99-Latenz, Peak-RSS und verschwendete Requests (429/5xx, doppelte POSTs).
+#
+#   python bench/benchmark.py --groups 4 --members 5000 --latency-ms 20 --p429 0.02
+#   python bench/benchmark.py --scenario process --engine async --parallel-groups 2
+
+import argparse
+import importlib.util
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import requests
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from mock_steam import MockSteam  # noqa: E402
+
+# Hauptskript als Modul laden; auf Modulebene, damit gespawnte Worker-Prozesse
+# (Watchdog/Pool) die Einstiegsfunktionen unter demselben Namen wiederfinden.
+_spec = importlib.util.spec_from_file_location("steam_group_blocker", BENCH_DIR.parent / "steam-group-blocker.py")
+sgb = importlib.util.module_from_spec(_spec)
+sys.modules["steam_group_blocker"] = sgb
+_spec.loader.exec_module(sgb)
+
+# ---------- Client-Latenz ----------
+_LAT: List[float] = []
+_LAT_LOCK = threading.Lock()
+_orig_request = requests.Session.request
+
+def _timed_request(self, method, url, *args, **kwargs):
+    t0 = time.perf_counter()
+    try:
+        return _orig_request(self, method, url, *args, **kwargs)
+    finally:
+        dt = time.perf_counter() - t0
+        with _LAT_LOCK:
+            _LAT.append(dt)
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(p / 100.0 * (len(s) - 1)))))
+    return s[k]
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux: KiB, macOS: Bytes
+    scale = 1.0 if sys.platform == "darwin" else 1024.0
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return max(own, children) / (1024.0 * 1024.0)
+
+# ---------- Konfiguration ----------
+def make_config(args, base_url: str, groups_file: Path, work: Path) -> dict:
+    return {
+        "general": {
+            "groups_file": str(groups_file),
+            "max_per_group": args.max_per_group,
+            "dry_run": False,
+            "dedup_across_groups": args.dedup,
+            "parallel_groups": args.parallel_groups,
+            "group_timeout_seconds": 3600,
+            "log_level": "WARNING",
+            "resume": False,
+        },
+        "block": {
+            "mode": "block",
+            "concurrency": args.concurrency,
+            "engine": args.engine,
+            "streaming": args.streaming,
+            "referer": "profile",
+            "breaker_fail_max": 1_000_000,
+            "breaker_error_rate": 1.0,
+        },
+        "ledger": {"enabled": args.ledger, "path": str(work / "ledger.sqlite3")},
+        "http": {
+            "base_url": base_url,
+            "page_concurrency": args.page_concurrency,
+            "pool_maxsize": max(50, args.concurrency),
+            "rate_control": args.rate_control,
+            "rate_initial": args.rate_initial,
+            "rate_max": max(args.rate_initial, 200.0),
+        },
+        "checkpoint": {"enabled": False, "dir": str(work / "checkpoints")},
+        "cache": {"enabled": args.cache, "path": str(work / "cache.sqlite3")},
+        # alle übrigen Zustandsdateien ebenfalls ins Arbeitsverzeichnis (nicht ins aktuelle Verzeichnis)
+        "retry": {"path": str(work / "retry.sqlite3")},
+        "distributed": {"path": str(work / "workqueue.sqlite3")},
+        "preflight": {"path": str(work / "groups_meta.json")},
+        "plan": {"dump": str(work / "plan.ndjson")},
+        "diff": {"dir": str(work / "snapshots")},
+        "metrics": {"enabled": args.report is not None, "dir": args.report or str(work / "reports")},
+    }
+
+# ---------- Ablauf ----------
+def run(args) -> dict:
+    mock = MockSteam({f"g{i}": args.members for i in range(args.groups)}, page_size=args.page_size,
+                     overlap=args.overlap, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                     p429=args.p429, p5xx=args.p5xx, retry_after=args.retry_after, rate_limit=args.rate_limit,
+                     status_5xx=args.status_5xx)
+    base_url = mock.start()
+    group_urls = [mock.group_url(name) for name in mock.groups]
+    cookies = {"sessionid": "bench", "steamLoginSecure": "bench"}
+
+    with tempfile.TemporaryDirectory(prefix="sgb-bench-") as tmp:
+        work = Path(tmp)
+        groups_file = work / "groups.txt"
+        groups_file.write_text("\n".join(group_urls) + "\n", encoding="utf-8")
+        config = make_config(args, base_url, groups_file, work)
+        need = args.max_per_group if args.max_per_group > 0 else None
+
+        requests.Session.request = _timed_request
+        t0 = time.perf_counter()
+        try:
+            if args.scenario == "single":
+                for url in group_urls:
+                    sgb.run_group_with_single_progress(config, url, need, cookies, False, "block",
+                                                       args.concurrency, "profile")
+            else:
+                sgb.process_groups(config, group_urls, args.max_per_group, cookies["sessionid"],
+                                   cookies["steamLoginSecure"], False, "block", args.concurrency, "profile")
+        finally:
+            elapsed = time.perf_counter() - t0
+            requests.Session.request = _orig_request
+            mock.stop()
+
+    st = mock.stats
+    wasted = st["status_429"] + sum(n for k, n in st.items() if k.startswith("status_5")) + mock.duplicate_posts()
+    with _LAT_LOCK:
+        lat = list(_LAT)
+    return {
+        "scenario": args.scenario,
+        "engine": args.engine,
+        "elapsed_s": elapsed,
+        "pages": st["pages"],
+        "blocks": len(mock.posts),
+        "pages_per_s": st["pages"] / elapsed if elapsed else 0.0,
+        "blocks_per_s": len(mock.posts) / elapsed if elapsed else 0.0,
+        # Watchdog/Pool laufen in eigenen Prozessen → dort nur im Hauptprozess gemessene Requests
+        "latency_samples": len(lat),
+        "p50_ms": percentile(lat, 50) * 1000.0,
+        "p99_ms": percentile(lat, 99) * 1000.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "requests": st["get"] + st["post"],
+        "status_429": st["status_429"],
+        "status_5xx": sum(n for k, n in st.items() if k.startswith("status_5")),
+        "duplicate_posts": mock.duplicate_posts(),
+        "wasted": wasted,
+    }
+
+def report(res: dict) -> None:
+    print(f"Szenario      : {res['scenario']} (engine={res['engine']})")
+    print(f"Dauer         : {res['elapsed_s']:.2f} s")
+    print(f"Seiten        : {res['pages']} ({res['pages_per_s']:.1f}/s)")
+    print(f"Blocks        : {res['blocks']} ({res['blocks_per_s']:.1f}/s)")
+    if res["latency_samples"]:
+        print(f"Latenz        : p50={res['p50_ms']:.1f} ms  p99={res['p99_ms']:.1f} ms  (n={res['latency_samples']})")
+    else:
+        print("Latenz        : – (Requests liefen in Worker-Prozessen)")
+    rss = res["peak_rss_mb"]
+    print(f"Peak-RSS      : {rss:.1f} MiB" if rss is not None else "Peak-RSS      : –")
+    print(f"Requests      : {res['requests']}  verschwendet={res['wasted']} "
+          f"(429={res['status_429']}, 5xx={res['status_5xx']}, doppelte POSTs={res['duplicate_posts']})")
+
+def main():
+    ap = argparse.ArgumentParser(description="Durchsatz-Benchmark gegen den lokalen Steam-Mock")
+    ap.add_argument("--scenario", choices=("single", "process"), default="single",
+                    help="single = run_group_with_single_progress im Prozess, process = process_groups")
+    ap.add_argument("--groups", type=int, default=3)
+    ap.add_argument("--members", type=int, default=3000)
+    ap.add_argument("--overlap", type=float, default=0.5)
+    ap.add_argument("--page-size", type=int, default=1000)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--p429", type=float, default=0.0)
+    ap.add_argument("--p5xx", type=float, default=0.0)
+    ap.add_argument("--status-5xx", type=int, default=503, help="Statuscode der injizierten Serverfehler (503 bremst die Ratensteuerung)")
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="serverseitiges Limit in Requests/s (0 = aus)")
+    ap.add_argument("--max-per-group", type=int, default=0)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--page-concurrency", type=int, default=4)
+    ap.add_argument("--parallel-groups", type=int, default=1)
+    ap.add_argument("--engine", choices=("threads", "async"), default="threads")
+    ap.add_argument("--streaming", action="store_true")
+    ap.add_argument("--dedup", action="store_true", help="general.dedup_across_groups")
+    ap.add_argument("--ledger", action="store_true")
+    ap.add_argument("--cache", action="store_true")
+    ap.add_argument("--report", metavar="DIR", default=None, help="Metrik-Bericht (metrics.enabled) in DIR schreiben")
+    ap.add_argument("--no-rate-control", dest="rate_control", action="store_false")
+    ap.add_argument("--rate-initial", type=float, default=200.0)
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    report(run(args))
+
+
+if __name__ == "__main__":
+    main()
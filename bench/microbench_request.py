@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Mikrobenchmark: CPU-Zeit pro Block-Request ohne Netzwerk (Stub-Adapter statt Socket).
+# "vorher" bildet den früheren Pfad nach (Config-Lookups, Header-/Form-Dicts und Cookie-Header pro
+# Request, cookies= zusätzlich, zwei INFO-Logzeilen); "nachher" nutzt RequestPlan, vorbereitete
+# Session und Form-Template aus dem Hauptskript.
+#
+#   python bench/microbench_request.py --n 20000
+
+import argparse
+import importlib.util
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import BaseAdapter
+
+BENCH_DIR = Path(__file__).resolve().parent
+_spec = importlib.util.spec_from_file_location("steam_group_blocker", BENCH_DIR.parent / "steam-group-blocker.py")
+sgb = importlib.util.module_from_spec(_spec)
+sys.modules["steam_group_blocker"] = sgb
+_spec.loader.exec_module(sgb)
+
+BASE_URL = "https://steamcommunity.com"
+COOKIES = {"sessionid": "0123456789abcdef01234567", "steamLoginSecure": "76561198000000000%7C%7C" + "x" * 300}
+CONFIG = {"http": {"rate_control": False}, "metrics": {"enabled": False}}
+
+# Antwortet sofort mit {"success":1}; misst damit nur den Client-Anteil
+class StubAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.headers["Content-Type"] = "application/json; charset=utf-8"
+        resp._content = b'{"success":1}'
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+def stub_session() -> requests.Session:
+    s = requests.Session()
+    s.mount("https://", StubAdapter())
+    s.mount("http://", StubAdapter())
+    return s
+
+# ---------- vorher ----------
+def legacy_safe_request(config, session, method, url, headers=None, cookies=None, data=None, context=""):
+    http_cfg = sgb.get_cfg(config, "http", {})
+    ct = float(sgb.get_cfg(http_cfg, "connect_timeout", 5.0))
+    rt = float(sgb.get_cfg(http_cfg, "read_timeout", 20.0))
+    max_attempts = int(sgb.get_cfg(http_cfg, "retries_total", 3)) + 1
+    sgb.get_rate_controller(config)
+    sgb.metrics_on(config)
+    logging.info("%s %d/%d → %s", method, 1, max_attempts, url)
+    hdrs = dict(headers or {})
+    if cookies:
+        hdrs["Cookie"] = f"sessionid={cookies.get('sessionid', '')};steamLoginSecure={cookies.get('steamLoginSecure', '')}"
+    resp = session.request(method=method, url=url, headers=hdrs, cookies=cookies, data=data, timeout=(ct, rt))
+    logging.info("Status %s", resp.status_code)
+    return resp
+
+def legacy_block(session, steamid: int) -> bool:
+    url = f"{BASE_URL}/actions/BlockUserAjax"
+    headers = {
+        "User-Agent": sgb.DEFAULT_HEADERS["User-Agent"],
+        "Referer": f"{BASE_URL}/profiles/{steamid}",
+        "Origin": BASE_URL,
+        "Accept": "application/json, text/javascript, */*; q=0.01",
+        "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    }
+    form = {"sessionID": COOKIES["sessionid"], "steamid": str(steamid), "block": "1", "ajax": "1", "json": "1"}
+    resp = legacy_safe_request(CONFIG, session, "POST", url, headers=headers, cookies=COOKIES, data=form,
+                               context=f"POST sid={steamid} block")
+    return resp.ok and bool(resp.json().get("success", True))
+
+# ---------- nachher ----------
+def make_prepared():
+    session = stub_session()
+    sgb.prepare_block_session(session, COOKIES, BASE_URL)
+    plan = sgb.RequestPlan(CONFIG)
+    prefix, suffix = sgb.block_form_template(COOKIES, "block")
+    url = f"{BASE_URL}/actions/BlockUserAjax"
+    profile_prefix = f"{BASE_URL}/profiles/"
+
+    def block(steamid: int) -> bool:
+        resp = sgb.safe_request(CONFIG, session, "POST", url, headers={"Referer": f"{profile_prefix}{steamid}"},
+                                data=b"%b%d%b" % (prefix, steamid, suffix),
+                                context=f"POST sid={steamid} block", plan=plan)
+        return resp.ok and bool(resp.json().get("success", True))
+    return block
+
+def measure(fn, n: int) -> float:
+    base = 76561198000000000
+    for i in range(min(500, n)):
+        fn(base + i)
+    t0 = time.process_time()
+    for i in range(n):
+        fn(base + i)
+    return (time.process_time() - t0) / n * 1e6
+
+def main():
+    ap = argparse.ArgumentParser(description="CPU-Kosten pro Block-Request (vorher/nachher)")
+    ap.add_argument("--n", type=int, default=20000)
+    args = ap.parse_args()
+
+    # INFO-Logs wie im normalen Lauf tatsächlich formatieren (in einen Puffer statt aufs Terminal)
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+
+    legacy_session = stub_session()
+    before = measure(lambda sid: legacy_block(legacy_session, sid), args.n)
+    after = measure(make_prepared(), args.n)
+    print(f"vorher : {before:8.1f} µs CPU/Request")
+    print(f"nachher: {after:8.1f} µs CPU/Request  ({(1 - after / before) * 100:.0f}% weniger)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Lokaler Steam-Ersatz für Tests/Benchmarks (komplett offline):
+#   GET  /groups/<name>/memberslistxml/?xml=1&p=N   → Mitgliederliste wie steamcommunity.com
+#   POST /actions/BlockUserAjax                     → {"success": 1}
+# Latenz, Seitengröße, 429/5xx-Injektion, Retry-After und ein serverseitiges Ratenlimit sind einstellbar.
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+STEAMID64_BASE = 76561197960265728
+
+
+class MockSteam:
+    def __init__(self, groups: Dict[str, int], page_size: int = 1000, overlap: float = 0.5,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, p429: float = 0.0, p5xx: float = 0.0,
+                 retry_after: Optional[float] = 1.0, rate_limit: float = 0.0, etag: bool = True, seed: int = 1,
+                 status_5xx: int = 503):
+        self.groups = dict(groups)
+        self.page_size = max(1, page_size)
+        self.latency_s = latency_ms / 1000.0
+        self.jitter_s = jitter_ms / 1000.0
+        self.p429 = p429
+        self.p5xx = p5xx
+        self.status_5xx = status_5xx
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.etag = etag
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bucket = rate_limit
+        self._bucket_ts = time.monotonic()
+        # Gruppe i beginnt um (1 - overlap) * Größe der vorherigen Gruppe versetzt → Überschneidungen
+        self._offsets: Dict[str, int] = {}
+        off = 0
+        for name, size in self.groups.items():
+            self._offsets[name] = off
+            off += int(size * (1.0 - overlap))
+        self.stats: Counter = Counter()
+        self.posts: Counter = Counter()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # ---------- Steuerung ----------
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        mock = self
+
+        class Handler(_Handler):
+            steam = mock
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mock-steam", daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def group_url(self, name: str) -> str:
+        return f"{self.url}/groups/{name}"
+
+    def duplicate_posts(self) -> int:
+        with self._lock:
+            return sum(n - 1 for n in self.posts.values() if n > 1)
+
+    # ---------- Verhalten ----------
+    def members(self, name: str) -> range:
+        start = STEAMID64_BASE + self._offsets[name]
+        return range(start, start + self.groups[name])
+
+    def _delay(self) -> None:
+        if self.latency_s or self.jitter_s:
+            with self._lock:
+                d = self.latency_s + self._rng.uniform(0.0, self.jitter_s)
+            time.sleep(d)
+
+    # → (Status, Retry-After) für eine Fehlerantwort oder None
+    def _inject(self) -> Optional[Tuple[int, Optional[float]]]:
+        with self._lock:
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                self._bucket = min(self.rate_limit, self._bucket + (now - self._bucket_ts) * self.rate_limit)
+                self._bucket_ts = now
+                if self._bucket < 1.0:
+                    return 429, self.retry_after
+                self._bucket -= 1.0
+            r = self._rng.random()
+        if r < self.p429:
+            return 429, self.retry_after
+        if r < self.p429 + self.p5xx:
+            return self.status_5xx, None
+        return None
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    # pro Account (sessionID) zählen: dieselbe ID von zwei Accounts ist kein doppelter POST
+    def record_post(self, session_id: str, steamid: str) -> None:
+        with self._lock:
+            self.posts[(session_id, steamid)] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    steam: MockSteam
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", ctype: str = "text/plain",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.steam.count(f"status_{status}")
+
+    def _maybe_fail(self) -> bool:
+        fail = self.steam._inject()
+        if fail is None:
+            return False
+        status, retry_after = fail
+        headers = {"Retry-After": str(int(retry_after))} if (status == 429 and retry_after is not None) else None
+        self._send(status, b"error", headers=headers)
+        return True
+
+    def do_GET(self):
+        st = self.steam
+        st.count("get")
+        st._delay()
+        u = urlparse(self.path)
+        parts = [p for p in u.path.split("/") if p]
+        if len(parts) < 2 or parts[0] != "groups":
+            self._send(404, b"not found")
+            return
+        if parts[1] not in st.groups:
+            # wie Steam: unbekannte Gruppe → 200 mit Fehler-XML statt Mitgliederliste
+            self._send(200, b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                            b"<response><error><![CDATA[The specified group could not be found.]]></error></response>",
+                       "text/xml; charset=utf-8")
+            return
+        if self._maybe_fail():
+            return
+        name = parts[1]
+        try:
+            page = max(1, int(parse_qs(u.query).get("p", ["1"])[0]))
+        except ValueError:
+            page = 1
+        etag = f'"{name}-{page}-{st.groups[name]}"'
+        if st.etag and self.headers.get("If-None-Match") == etag:
+            self._send(304)
+            return
+        members = st.members(name)
+        total_pages = max(1, -(-len(members) // st.page_size))
+        chunk = members[(page - 1) * st.page_size:page * st.page_size]
+        body = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?><memberList>'
+            f"<groupID64>103582791429521408</groupID64><groupDetails><groupName><![CDATA[{name}]]></groupName>"
+            f"<memberCount>{len(members)}</memberCount></groupDetails><memberCount>{len(members)}</memberCount>"
+            f"<totalPages>{total_pages}</totalPages><currentPage>{page}</currentPage>"
+            f"<startingMember>{(page - 1) * st.page_size}</startingMember><members>"
+            + "".join(f"<steamID64>{sid}</steamID64>" for sid in chunk)
+            + "</members></memberList>"
+        ).encode("utf-8")
+        st.count("pages")
+        self._send(200, body, "text/xml; charset=utf-8", {"ETag": etag} if st.etag else None)
+
+    def do_POST(self):
+        st = self.steam
+        length = int(self.headers.get("Content-Length", "0") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8")) if length else {}
+        st.count("post")
+        st._delay()
+        if urlparse(self.path).path.rstrip("/") != "/actions/BlockUserAjax":
+            self._send(404, b"not found")
+            return
+        if self._maybe_fail():
+            return
+        steamid = (form.get("steamid") or [""])[0]
+        session_id = (form.get("sessionID") or [""])[0]
+        if not session_id or not steamid.isdigit():
+            self._send(200, json.dumps({"success": 0}).encode(), "application/json; charset=utf-8")
+            return
+        st.record_post(session_id, steamid)
+        self._send(200, json.dumps({"success": 1}).encode(), "application/json; charset=utf-8")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lokaler Steam-Mock (memberslistxml + BlockUserAjax)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--groups", type=int, default=5, help="Anzahl Gruppen (g0, g1, …)")
+    ap.add_argument("--members", type=int, default=5000, help="Mitglieder je Gruppe")
+    ap.add_argument("--overlap", type=float, default=0.5, help="Anteil Überschneidung benachbarter Gruppen")
+    ap.add_argument("--page-size", type=int, default=1000)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--p429", type=float, default=0.0)
+    ap.add_argument("--p5xx", type=float, default=0.0)
+    ap.add_argument("--status-5xx", type=int, default=503, help="Statuscode der injizierten Serverfehler")
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="Requests/s, darüber 429 (0 = aus)")
+    args = ap.parse_args()
+
+    mock = MockSteam({f"g{i}": args.members for i in range(args.groups)}, page_size=args.page_size,
+                     overlap=args.overlap, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                     p429=args.p429, p5xx=args.p5xx, retry_after=args.retry_after, rate_limit=args.rate_limit,
+                     status_5xx=args.status_5xx)
+    url = mock.start(args.host, args.port)
+    print(f"Mock läuft auf {url} (http.base_url = \"{url}\")")
+    for name in mock.groups:
+        print(mock.group_url(name))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,32 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
+import heapq
+import asyncio
+import hashlib
+import json
 import logging
+import mmap
 import os
+import queue
+import socket
+from array import array
+from bisect import bisect_left
+import sqlite3
 import sys
 import time
 import threading
+import zlib
+from collections import Counter, deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
 from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import accumulate, islice
 
 import requests
 import xml.etree.ElementTree as ET
@@ -27,21 +44,41 @@ from urllib3.util.retry import Retry
 
 # Process-Isolation (Watchdog pro Gruppe)
 import multiprocessing as mp
+from multiprocessing.connection import Connection, wait as wait_conns
 
-# Rich UI
-from rich.console import Console
-from rich.progress import (
-    Progress,
-    SpinnerColumn,
-    BarColumn,
-    TextColumn,
-    TimeElapsedColumn,
-    TimeRemainingColumn,
-    TaskProgressColumn,
-)
-from rich.logging import RichHandler
-
-console = Console()
+# Ausgabe: rich wird erst bei Bedarf importiert (plain-Modus startet ohne rich)
+_CONSOLE = None
+
+# "rich" (Fortschrittsbalken) oder "plain" (Zeilen, für Cron/Container); "auto" = plain ohne TTY.
+# Über SGB_OUTPUT, damit gespawnte Worker-Prozesse denselben Modus nutzen
+def output_mode() -> str:
+    mode = os.getenv("SGB_OUTPUT", "auto").lower()
+    if mode not in ("rich", "plain"):
+        mode = "rich" if sys.stdout.isatty() else "plain"
+    return mode
+
+def get_console():
+    global _CONSOLE
+    if _CONSOLE is None:
+        from rich.console import Console
+        _CONSOLE = Console()
+    return _CONSOLE
+
+# Zeile mit Uhrzeit direkt auf stdout (auch aus Worker-Prozessen ohne Logging-Setup sichtbar)
+def emit(line: str) -> None:
+    print(f"{time.strftime('%H:%M:%S')} {line}", flush=True)
+
+def out(text: str, end: str = "\n") -> None:
+    if output_mode() == "plain":
+        print(text, end=end, flush=True)
+    else:
+        get_console().print(text, end=end)
+
+def rule(title: str, detail: str = "") -> None:
+    if output_mode() == "plain":
+        emit(f"== {title} {detail}".rstrip())
+    else:
+        get_console().rule(f"[bold]{title}[/] {detail}".rstrip())
 
 # ---------- Konfiguration ----------
 def load_config(config_path: Path) -> dict:
@@ -66,6 +103,170 @@ DEFAULT_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# ---------- Laufzähler ----------
+# Prozessweite Zähler (Cache-Treffer usw.); Worker-Prozesse schicken sie mit dem Ergebnis zurück
+RUN_STATS: Counter = Counter()
+_STATS_LOCK = threading.Lock()
+
+def stat_add(key: str, n: float = 1) -> None:
+    with _STATS_LOCK:
+        RUN_STATS[key] += n
+
+def merge_stats(stats: Optional[dict]) -> None:
+    if not stats:
+        return
+    # gelernte Rate des Workers ist kein Zähler → Startwert für die nächsten Worker
+    rate = stats.pop("rate_last", None)
+    if rate:
+        seed_rate(rate)
+    with _STATS_LOCK:
+        RUN_STATS.update(stats)
+
+# Differenz zweier RUN_STATS-Stände (z. B. Anteil einer Gruppe)
+def stats_delta(before: dict, after: dict) -> dict:
+    return {k: v - before.get(k, 0) for k, v in after.items() if v != before.get(k, 0)}
+
+# ---------- Metriken ----------
+# Flache Schlüssel in RUN_STATS ("req|block", "status|block|200", "lat|members|50", …) → werden
+# wie alle Zähler aus den Worker-Prozessen zurückgemerged; ausgeschaltet kostet es nur eine Abfrage.
+LAT_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+def metrics_on(config: dict) -> bool:
+    return bool(get_cfg(get_cfg(config, "metrics", {}), "enabled", False))
+
+def endpoint_of(url: str) -> str:
+    if "BlockUserAjax" in url:
+        return "block"
+    if "memberslistxml" in url:
+        return "members"
+    return "other"
+
+def record_request(ep: str, status: Optional[int], seconds: float, nbytes: int, retried: bool,
+                   history: Tuple[Optional[int], ...] = ()) -> None:
+    ms = seconds * 1000.0
+    i = bisect_left(LAT_BOUNDS_MS, ms)
+    bucket = str(LAT_BOUNDS_MS[i]) if i < len(LAT_BOUNDS_MS) else "inf"
+    with _STATS_LOCK:
+        RUN_STATS[f"req|{ep}"] += 1
+        RUN_STATS[f"status|{ep}|{status if status is not None else 'exc'}"] += 1
+        RUN_STATS[f"lat|{ep}|{bucket}"] += 1
+        RUN_STATS[f"lat_ms|{ep}"] += ms
+        if nbytes:
+            RUN_STATS[f"bytes|{ep}"] += nbytes
+        if retried or history:
+            RUN_STATS[f"retries|{ep}"] += retried + len(history)
+        for st in history:
+            RUN_STATS[f"status|{ep}|{st if st is not None else 'exc'}"] += 1
+
+def _hist_percentile(hist: Dict[str, int], p: float) -> Optional[float]:
+    n = sum(hist.values())
+    if not n:
+        return None
+    need = p / 100.0 * n
+    seen = 0
+    for b in [str(x) for x in LAT_BOUNDS_MS] + ["inf"]:
+        seen += hist.get(b, 0)
+        if seen >= need:
+            return float(b) if b != "inf" else None
+    return None
+
+# Flache Zähler → verschachtelter Bericht (pro Endpoint: Requests, Status, Latenz, Bytes, Retries)
+def summarize_metrics(stats: dict) -> dict:
+    endpoints: Dict[str, dict] = {}
+    other: Dict[str, float] = {}
+    for key, v in stats.items():
+        parts = key.split("|")
+        if len(parts) == 1:
+            other[key] = v
+            continue
+        ep = endpoints.setdefault(parts[1], {"requests": 0, "status": {}, "latency_ms": {"hist": {}},
+                                             "rate_wait_ms": 0.0, "bytes": 0, "retries": 0})
+        kind = parts[0]
+        if kind == "req":
+            ep["requests"] = v
+        elif kind == "status":
+            ep["status"][parts[2]] = v
+        elif kind == "lat":
+            ep["latency_ms"]["hist"][parts[2]] = v
+        elif kind == "lat_ms":
+            ep["latency_ms"]["sum"] = round(v, 3)
+        elif kind == "wait_ms":
+            # Summe der Wartezeit auf den RateController (nicht in der Latenz enthalten)
+            ep["rate_wait_ms"] = round(v, 3)
+        elif kind in ("bytes", "retries"):
+            ep[kind] = v
+    # Keep-Alive: Requests über bereits offene Verbindungen
+    if other.get("conn_requests"):
+        other["conn_reused"] = max(0, other["conn_requests"] - other.get("conn_opened", 0))
+    order = {str(b): i for i, b in enumerate(LAT_BOUNDS_MS)}
+    for ep in endpoints.values():
+        lat = ep["latency_ms"]
+        lat["hist"] = dict(sorted(lat["hist"].items(), key=lambda kv: order.get(kv[0], len(order))))
+        if ep["requests"]:
+            lat["mean"] = round(lat.get("sum", 0.0) / ep["requests"], 3)
+        lat["p50"] = _hist_percentile(lat["hist"], 50)
+        lat["p99"] = _hist_percentile(lat["hist"], 99)
+    return {"endpoints": endpoints, "counters": other}
+
+# Bericht pro Gruppe und für den ganzen Lauf (JSON oder NDJSON im Verzeichnis metrics.dir)
+class RunReport:
+    def __init__(self, config: dict):
+        mcfg = get_cfg(config, "metrics", {})
+        self.enabled = metrics_on(config)
+        self.fmt = str(get_cfg(mcfg, "format", "ndjson")).lower()
+        self.directory = Path(str(get_cfg(mcfg, "dir", "reports"))).expanduser()
+        self.started = time.time()
+        self.groups: List[dict] = []
+        self.given_up: List[dict] = []
+
+    def add_group(self, group: str, phase: str, res: Optional[Tuple[int, int, int]], stats: dict) -> None:
+        if not self.enabled:
+            return
+        sel, ok, err = res if res is not None else (0, 0, 0)
+        self.groups.append({"type": "group", "group": group, "phase": phase, "selected": sel, "ok": ok,
+                            "err": err, **summarize_metrics(stats)})
+
+    # endgültig aufgegebene IDs aus der Retry-Queue (SteamIDs als String, wie im NDJSON-Export)
+    def add_given_up(self, rows: List[Tuple[int, int]], account: str = "") -> None:
+        if not self.enabled:
+            return
+        for sid, attempts in rows:
+            rec = {"steamid": str(sid), "attempts": attempts}
+            if account:
+                rec["account"] = account
+            self.given_up.append(rec)
+
+    def write(self, selected: int, ok: int, err: int) -> Optional[Path]:
+        if not self.enabled:
+            return None
+        publish_pool_stats()
+        run = {"type": "run", "started": self.started, "duration_s": round(time.time() - self.started, 3),
+               "groups": len(self.groups), "selected": selected, "ok": ok, "err": err,
+               **summarize_metrics(dict(RUN_STATS)), "given_up": self.given_up}
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if self.fmt == "json":
+                path = self.directory / f"run-{stamp}.json"
+                path.write_text(json.dumps({"run": run, "groups": self.groups}, indent=2), encoding="utf-8")
+            else:
+                path = self.directory / f"run-{stamp}.ndjson"
+                with open(path, "w", encoding="utf-8") as f:
+                    for rec in self.groups + [run]:
+                        f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logging.error("Bericht nicht schreibbar (%s): %s", self.directory, e)
+            return None
+        logging.info("Bericht: %s", path)
+        return path
+
+# Basis-URL für BlockUserAjax/Profile; überschreibbar (http.base_url) für lokalen Mock/Benchmark
+STEAM_BASE_URL = "https://steamcommunity.com"
+
+def steam_base_url(config: dict) -> str:
+    http_cfg = get_cfg(config, "http", {})
+    return str(get_cfg(http_cfg, "base_url", STEAM_BASE_URL)).rstrip("/")
+
 # ---------- urllib3-Logs dämpfen ----------
 def quiet_urllib3_logging(http_cfg: dict):
     suppress = bool(get_cfg(http_cfg, "suppress_pool_warnings", True))
@@ -73,37 +274,243 @@ def quiet_urllib3_logging(http_cfg: dict):
         logging.getLogger("urllib3").setLevel(logging.ERROR)
         logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
 
+# ---------- Ratenbegrenzung (Token-Bucket + AIMD) ----------
+# Gemeinsam für alle GETs/POSTs eines Prozesses: 429/503 → Rate multiplikativ senken und
+# Retry-After abwarten; Erfolge → Rate langsam (additiv, ~+increase/s) wieder anheben
+class RateController:
+    def __init__(self, rate: float, min_rate: float, max_rate: float, increase: float,
+                 decrease: float, burst: float):
+        self.min_rate = max(0.01, min_rate)
+        self.max_rate = max(self.min_rate, max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = max(1.0, burst)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.inflight = 0
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait_s = self._blocked_until - now
+                if wait_s <= 0:
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        self.inflight += 1
+                        return
+                    wait_s = (1.0 - self._tokens) / self.rate
+            time.sleep(min(wait_s, 1.0))
+
+    def release(self, status: Optional[int], retry_after: Optional[float]) -> None:
+        with self._lock:
+            self.inflight = max(0, self.inflight - 1)
+            now = time.monotonic()
+            if status in (429, 503):
+                # viele parallele 429 zählen als ein Drossel-Ereignis
+                if now - self._last_decrease >= 1.0:
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self._last_decrease = now
+                pause = retry_after if retry_after is not None else 1.0 / self.rate
+                self._blocked_until = max(self._blocked_until, now + pause)
+                self._tokens = 0.0
+            elif status is not None and status < 400:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+_RATE: Optional[RateController] = None
+_RATE_SHARE = 1
+_RATE_SEED: Optional[float] = None  # gelernte Gesamtrate → Startwert des nächsten Controllers
+_RATE_LOCK = threading.Lock()
+
+def rate_control_enabled(http_cfg: dict) -> bool:
+    return bool(get_cfg(http_cfg, "rate_control", True))
+
+# Parallele Worker-Prozesse teilen sich das Budget: jeder regelt 1/share der Raten mit eigenem Zustand.
+# Kein prozessübergreifender Lock – ein per Watchdog beendeter Worker könnte ihn sonst für alle festhalten.
+# seed: vom Hauptprozess mitgegebene Rate, sonst startet der neue Controller mit der eigenen zuletzt gelernten
+def set_rate_share(share: int, seed: Optional[float] = None) -> None:
+    global _RATE, _RATE_SHARE, _RATE_SEED
+    with _RATE_LOCK:
+        if seed:
+            _RATE_SEED = seed
+        elif _RATE is not None:
+            _RATE_SEED = _RATE.rate * _RATE_SHARE
+        _RATE_SHARE = max(1, share)
+        _RATE = None
+
+# Gelernte Rate (Gesamtbudget) eines Workers merken; neue Worker bekommen sie über rate_seed() beim Start
+# bzw. mit dem Job, damit AIMD nicht je Gruppe wieder bei rate_initial anfängt
+def seed_rate(rate: float) -> None:
+    global _RATE_SEED
+    with _RATE_LOCK:
+        _RATE_SEED = rate
+
+def rate_seed() -> Optional[float]:
+    with _RATE_LOCK:
+        if _RATE_SEED is not None:
+            return _RATE_SEED
+        return None if _RATE is None else _RATE.rate * _RATE_SHARE
+
+# aktuelle Rate dieses Prozesses hochgerechnet aufs Gesamtbudget (None = noch kein Controller)
+def current_rate() -> Optional[float]:
+    with _RATE_LOCK:
+        return None if _RATE is None else _RATE.rate * _RATE_SHARE
+
+def get_rate_controller(config: dict) -> Optional[RateController]:
+    global _RATE
+    http_cfg = get_cfg(config, "http", {})
+    if not rate_control_enabled(http_cfg):
+        return None
+    with _RATE_LOCK:
+        if _RATE is None:
+            share = _RATE_SHARE
+            initial = _RATE_SEED or float(get_cfg(http_cfg, "rate_initial", 20.0))
+            _RATE = RateController(
+                rate=initial / share,
+                min_rate=float(get_cfg(http_cfg, "rate_min", 0.5)) / share,
+                max_rate=float(get_cfg(http_cfg, "rate_max", 200.0)) / share,
+                increase=float(get_cfg(http_cfg, "rate_increase", 1.0)) / share,
+                decrease=float(get_cfg(http_cfg, "rate_decrease", 0.5)),
+                burst=float(get_cfg(http_cfg, "rate_burst", 10.0)) / share,
+            )
+        return _RATE
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+# Von urllib3 intern wiederholte Versuche (status_forcelist/Verbindungsfehler) → deren Statuscodes
+def retry_history(resp: requests.Response) -> Tuple[Optional[int], ...]:
+    retries = getattr(resp.raw, "retries", None)
+    return tuple(h.status for h in retries.history) if retries is not None else ()
+
+# Rate/In-Flight für die Progress-Anzeige
+def rate_fields(config: dict) -> dict:
+    rc = get_rate_controller(config)
+    if rc is None:
+        return {"rate": "-", "inflight": "-"}
+    return {"rate": f"{rc.rate:.1f}", "inflight": rc.inflight}
+
 # ---------- Session mit Retries/Timeouts/Pool ----------
-def make_session(http_cfg: dict) -> requests.Session:
+# Ein HTTPAdapter pro Prozess (und Retry-Einstellung): dessen urllib3-PoolManager hält einen Verbindungspool
+# je Host, den alle Sessions (Preflight, Seitenabruf, Block) teilen → TLS-Handshake einmal statt pro Session
+class SharedAdapter(HTTPAdapter):
+    # Session.close() darf den gemeinsamen Pool nicht schließen
+    def close(self) -> None:
+        pass
+
+_ADAPTERS: Dict[tuple, SharedAdapter] = {}
+_ADAPTERS_LOCK = threading.Lock()
+_HTTP2_TRIED = False
+_POOL_SEEN = [0, 0]  # bereits in RUN_STATS gezählte Verbindungen/Requests
+
+# HTTP/2 über urllib3 (experimentell, ab urllib3 2.3 mit Paket h2; nur HTTPS); sonst HTTP/1.1 mit Keep-Alive
+def enable_http2() -> None:
+    global _HTTP2_TRIED
+    if _HTTP2_TRIED:
+        return
+    _HTTP2_TRIED = True
+    try:
+        import urllib3.http2
+        urllib3.http2.inject_into_urllib3()
+        logging.info("HTTP/2 aktiv (urllib3 %s)", urllib3.__version__)
+    except Exception as e:
+        logging.warning("HTTP/2 nicht verfügbar (%s) → HTTP/1.1", e)
+
+# Poolgröße je Host für diesen Prozess: größte konfigurierte Parallelität (Blocken, Seitenabruf, Preflight)
+# bzw. die des Aufrufers. Der gemeinsame Adapter wird damit einmal beim Anlegen dimensioniert und wächst nicht nach.
+def pool_size_for(config: dict, concurrency: int = 0) -> int:
+    http_cfg = get_cfg(config, "http", {})
+    return max(int(get_cfg(http_cfg, "pool_maxsize", 50)),
+               int(get_cfg(get_cfg(config, "block", {}), "concurrency", 1)),
+               int(get_cfg(http_cfg, "page_concurrency", 4)),
+               int(get_cfg(get_cfg(config, "preflight", {}), "concurrency", 8)),
+               concurrency)
+
+# pool_size (siehe pool_size_for) gilt nur beim ersten Aufruf, der den gemeinsamen Adapter anlegt;
+# spätere Sessions teilen dessen Pool (ohne pool_block öffnet urllib3 bei Bedarf trotzdem weitere Verbindungen)
+def make_session(http_cfg: dict, pool_size: int = 0) -> requests.Session:
     retries_total = int(get_cfg(http_cfg, "retries_total", 3))
     retries_backoff = float(get_cfg(http_cfg, "retries_backoff", 0.5))
     pool_conns = int(get_cfg(http_cfg, "pool_connections", 20))
-    pool_size = int(get_cfg(http_cfg, "pool_maxsize", 50))
+    pool_size = max(int(get_cfg(http_cfg, "pool_maxsize", 50)), pool_size)
     pool_block = bool(get_cfg(http_cfg, "pool_block", False))
-    retry = Retry(
-        total=retries_total,
-        backoff_factor=retries_backoff,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=frozenset(["GET", "POST"]),
-        raise_on_status=False,
-        respect_retry_after_header=True,
-    )
-    adapter = HTTPAdapter(
-        max_retries=retry,
-        pool_connections=pool_conns,
-        pool_maxsize=pool_size,
-        pool_block=pool_block,
-    )
+    # 429/503 übernimmt der RateController (Retry-After, Backoff) – sonst verstecken sich Retries in urllib3
+    status_forcelist = [500, 502, 504] if rate_control_enabled(http_cfg) else [429, 500, 502, 503, 504]
+    if bool(get_cfg(http_cfg, "http2", False)):
+        enable_http2()
+    key = (retries_total, retries_backoff, tuple(status_forcelist), pool_conns, pool_block)
+    with _ADAPTERS_LOCK:
+        adapter = _ADAPTERS.get(key)
+        if adapter is None:
+            retry = Retry(
+                total=retries_total,
+                backoff_factor=retries_backoff,
+                status_forcelist=status_forcelist,
+                allowed_methods=frozenset(["GET", "POST"]),
+                raise_on_status=False,
+                respect_retry_after_header=True,
+            )
+            adapter = SharedAdapter(
+                max_retries=retry,
+                pool_connections=pool_conns,
+                pool_maxsize=pool_size,
+                pool_block=pool_block,
+            )
+            _ADAPTERS[key] = adapter
     s = requests.Session()
     s.mount("https://", adapter)
     s.mount("http://", adapter)
     return s
 
+# Neue Verbindungen/Requests seit dem letzten Aufruf nach RUN_STATS (conn_opened, conn_requests)
+def publish_pool_stats() -> None:
+    conns = reqs = 0
+    with _ADAPTERS_LOCK:
+        adapters = list(_ADAPTERS.values())
+    for adapter in adapters:
+        pm = adapter.poolmanager
+        for key in list(pm.pools.keys()):
+            pool = pm.pools.get(key)
+            if pool is not None:
+                conns += pool.num_connections
+                reqs += pool.num_requests
+    with _STATS_LOCK:
+        RUN_STATS["conn_opened"] += max(0, conns - _POOL_SEEN[0])
+        RUN_STATS["conn_requests"] += max(0, reqs - _POOL_SEEN[1])
+        _POOL_SEEN[0], _POOL_SEEN[1] = max(conns, _POOL_SEEN[0]), max(reqs, _POOL_SEEN[1])
+
+# RUN_STATS für die Rückgabe an den Hauptprozess (inkl. Pool-Zähler)
+def worker_stats() -> dict:
+    publish_pool_stats()
+    stats = dict(RUN_STATS)
+    rate = current_rate()
+    if rate is not None:
+        stats["rate_last"] = rate
+    return stats
+
 # ---------- Prompt/Fehler ----------
 _PROMPT_LOCK = threading.Lock()
 
 def prompt_with_timeout(prompt: str, timeout_sec: int) -> Optional[str]:
-    console.print(f"{prompt} (Timeout {timeout_sec}s) [j/N]: ", end="")
+    out(f"{prompt} (Timeout {timeout_sec}s) [j/N]: ", end="")
     start = time.time()
     try:
         while True:
@@ -113,11 +520,11 @@ def prompt_with_timeout(prompt: str, timeout_sec: int) -> Optional[str]:
                     return None
                 return line.strip()
             if time.time() - start >= timeout_sec:
-                console.print("")
+                out("")
                 return None
             time.sleep(0.1)
     except KeyboardInterrupt:
-        console.print("")
+        out("")
         return "n"
 
 def select_rfds():
@@ -180,6 +587,100 @@ def handle_error(config: dict, resp: Optional[requests.Response], exc: Optional[
         logging.info("Weiter.")
         return True
 
+# ---------- Seiten-Cache (ETag/Last-Modified, TTL, LRU) ----------
+# Speichert memberslistxml-Antworten komprimiert in SQLite; bedingte GETs sparen unveränderte Seiten
+class PageCache:
+    def __init__(self, path: Path, ttl_s: float, max_bytes: int):
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=30.0, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " body BLOB NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched REAL NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " size INTEGER NOT NULL"
+            ")"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages(accessed)")
+        self.conn.commit()
+        self._size = int(self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0])
+
+    # → (zlib-Body, ETag, Last-Modified, Alter in s) oder None
+    def get(self, url: str) -> Optional[Tuple[bytes, Optional[str], Optional[str], float]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, fetched FROM pages WHERE url=?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], row[2], time.time() - row[3]
+
+    def touch(self, url: str, revalidated: bool) -> None:
+        now = time.time()
+        with self._lock, self.conn:
+            if revalidated:
+                self.conn.execute("UPDATE pages SET accessed=?, fetched=? WHERE url=?", (now, now, url))
+            else:
+                self.conn.execute("UPDATE pages SET accessed=? WHERE url=?", (now, url))
+
+    def put(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        now = time.time()
+        with self._lock, self.conn:
+            old = self.conn.execute("SELECT size FROM pages WHERE url=?", (url,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages(url, body, etag, last_modified, fetched, accessed, size) "
+                "VALUES (?,?,?,?,?,?,?)",
+                (url, body, etag, last_modified, now, now, len(body)),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    # Älteste Zugriffe löschen, bis 90 % des Limits erreicht sind
+    def _evict(self) -> None:
+        target = int(self.max_bytes * 0.9)
+        rows = self.conn.execute("SELECT url, size FROM pages ORDER BY accessed").fetchall()
+        drop: List[Tuple[str]] = []
+        for url, size in rows:
+            if self._size <= target:
+                break
+            drop.append((url,))
+            self._size -= size
+        self.conn.executemany("DELETE FROM pages WHERE url=?", drop)
+        stat_add("cache_evicted", len(drop))
+
+_PAGE_CACHE: Optional[PageCache] = None
+_PAGE_CACHE_LOCK = threading.Lock()
+_PAGE_CACHE_BROKEN = False  # Öffnen fehlgeschlagen → für den Rest des Prozesses ohne Cache
+
+def get_page_cache(config: dict) -> Optional[PageCache]:
+    global _PAGE_CACHE, _PAGE_CACHE_BROKEN
+    cache_cfg = get_cfg(config, "cache", {})
+    if _PAGE_CACHE_BROKEN or not bool(get_cfg(cache_cfg, "enabled", True)):
+        return None
+    with _PAGE_CACHE_LOCK:
+        if _PAGE_CACHE is None and not _PAGE_CACHE_BROKEN:
+            path = Path(str(get_cfg(cache_cfg, "path", "cache.sqlite3"))).expanduser().resolve()
+            try:
+                _PAGE_CACHE = PageCache(
+                    path,
+                    ttl_s=float(get_cfg(cache_cfg, "ttl_seconds", 3600)),
+                    max_bytes=int(float(get_cfg(cache_cfg, "max_mb", 256)) * 1024 * 1024),
+                )
+            except (sqlite3.Error, OSError) as e:
+                logging.error("Seiten-Cache nicht nutzbar (%s): %s → ohne Cache weiter", path, e)
+                _PAGE_CACHE_BROKEN = True
+                return None
+        return _PAGE_CACHE
+
 # ---------- Feed & Requests ----------
 def build_members_url(base_url: str, page: int) -> str:
     parsed = urlparse(base_url.strip())
@@ -194,28 +695,93 @@ def build_members_url(base_url: str, page: int) -> str:
     new_parsed = parsed._replace(path=path, query=urlencode(q, doseq=True))
     return urlunparse(new_parsed)
 
+# Einmal aufgelöste Request-Parameter (Timeouts, Versuche, Ratensteuerung, Metriken, Log-Level),
+# damit der Hot Path pro Request keine Config-Lookups mehr macht
+class RequestPlan:
+    __slots__ = ("config", "timeout", "max_attempts", "rc", "metrics", "debug")
+
+    def __init__(self, config: dict):
+        http_cfg = get_cfg(config, "http", {})
+        self.config = config
+        self.timeout = (float(get_cfg(http_cfg, "connect_timeout", 5.0)),
+                        float(get_cfg(http_cfg, "read_timeout", 20.0)))
+        self.max_attempts = int(get_cfg(http_cfg, "retries_total", 3)) + 1
+        self.rc = get_rate_controller(config)
+        self.metrics = metrics_on(config)
+        self.debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+# Statische Block-Header und Cookies einmal pro Session setzen; der Cookie-Jar bleibt leer,
+# damit Set-Cookie-Antworten den festen Cookie-Header nicht überschreiben. Proxy/CA aus der
+# Umgebung werden einmal übernommen statt bei jedem Request os.environ zu durchsuchen.
+def prepare_block_session(session: requests.Session, cookies: Optional[dict], base_url: str) -> None:
+    if session.trust_env:
+        session.proxies.update(requests.utils.get_environ_proxies(base_url, no_proxy=None))
+        ca_bundle = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE")
+        if ca_bundle and session.verify is True:
+            session.verify = ca_bundle
+        session.trust_env = False
+    session.headers.update({
+        "User-Agent": DEFAULT_HEADERS["User-Agent"],
+        "Origin": base_url,
+        "Accept": "application/json, text/javascript, */*; q=0.01",
+        "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    })
+    if cookies:
+        session.headers["Cookie"] = (f"sessionid={cookies.get('sessionid', '')};"
+                                     f"steamLoginSecure={cookies.get('steamLoginSecure', '')}")
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+# Form-Body für BlockUserAjax als (Präfix, Suffix); pro ID wird nur die steamid dazwischengesetzt
+def block_form_template(cookies: Optional[dict], mode: str) -> Tuple[bytes, bytes]:
+    prefix = urlencode({"sessionID": (cookies or {}).get("sessionid", "")}) + "&steamid="
+    suffix = "&" + urlencode({"block": "1" if mode == "block" else "0", "ajax": "1", "json": "1"})
+    return prefix.encode("ascii"), suffix.encode("ascii")
+
 def safe_request(config: dict, session: requests.Session, method: str, url: str,
                  headers: Optional[Dict[str, str]] = None, cookies: Optional[Dict[str, str]] = None,
-                 data: Optional[Dict[str, str]] = None, context: str = "") -> Optional[requests.Response]:
-    http_cfg = get_cfg(config, "http", {})
-    ct = float(get_cfg(http_cfg, "connect_timeout", 5.0))
-    rt = float(get_cfg(http_cfg, "read_timeout", 20.0))
-    timeout = (ct, rt)
+                 data: Union[Dict[str, str], bytes, None] = None, context: str = "",
+                 stream: bool = False, plan: Optional[RequestPlan] = None,
+                 final_status: Tuple[int, ...] = ()) -> Optional[requests.Response]:
+    if plan is None:
+        plan = RequestPlan(config)
+    timeout = plan.timeout
+    max_attempts = plan.max_attempts
+    rc = plan.rc
+    ep = endpoint_of(url) if plan.metrics else None
 
     attempt = 1
-    max_attempts = int(get_cfg(http_cfg, "retries_total", 3)) + 1
-
     while attempt <= max_attempts:
-        logging.info("%s %d/%d → %s", method, attempt, max_attempts, url)
+        if plan.debug:
+            logging.debug("%s %d/%d → %s", method, attempt, max_attempts, url)
+        t0 = time.perf_counter() if ep is not None else 0.0
+        resp = None
         try:
-            hdrs = dict(headers or {})
-            if cookies:
-                sid = cookies.get("sessionid", "")
-                sls = cookies.get("steamLoginSecure", "")
-                hdrs["Cookie"] = f"sessionid={sid};steamLoginSecure={sls}"
-            resp = session.request(method=method, url=url, headers=hdrs, cookies=cookies, data=data, timeout=timeout)
-            logging.info("Status %s", resp.status_code)
-            if 200 <= resp.status_code < 300:
+            if rc is None:
+                resp = session.request(method=method, url=url, headers=headers, cookies=cookies, data=data,
+                                       timeout=timeout, stream=stream)
+            else:
+                rc.acquire()
+                if ep is not None:
+                    # Wartezeit auf das Ratenbudget getrennt zählen, Latenz erst ab hier messen
+                    t1 = time.perf_counter()
+                    stat_add(f"wait_ms|{ep}", (t1 - t0) * 1000.0)
+                    t0 = t1
+                status = retry_after = None
+                try:
+                    resp = session.request(method=method, url=url, headers=headers, cookies=cookies, data=data,
+                                       timeout=timeout, stream=stream)
+                    status = resp.status_code
+                    if status in (429, 503):
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                finally:
+                    rc.release(status, retry_after)
+            if ep is not None:
+                record_request(ep, resp.status_code, time.perf_counter() - t0,
+                               0 if stream else len(resp.content), attempt > 1, retry_history(resp))
+            if plan.debug:
+                logging.debug("Status %s", resp.status_code)
+            # final_status: Antwort ohne Wiederholung an den Aufrufer (z. B. 401/403 beim Blocken)
+            if 200 <= resp.status_code < 300 or resp.status_code == 304 or resp.status_code in final_status:
                 return resp
             cont = handle_error(config, resp, None, context=context)
             if not cont:
@@ -223,12 +789,16 @@ def safe_request(config: dict, session: requests.Session, method: str, url: str,
             attempt += 1
             continue
         except (requests.Timeout, requests.ConnectionError) as e:
+            if ep is not None and resp is None:
+                record_request(ep, None, time.perf_counter() - t0, 0, attempt > 1)
             cont = handle_error(config, None, e, context=context)
             if not cont:
                 return None
             attempt += 1
             continue
         except Exception as e:
+            if ep is not None and resp is None:
+                record_request(ep, None, time.perf_counter() - t0, 0, attempt > 1)
             cont = handle_error(config, None, e, context=context)
             if not cont:
                 return None
@@ -237,372 +807,3263 @@ def safe_request(config: dict, session: requests.Session, method: str, url: str,
     logging.error("Aufgegeben nach %d Versuchen.", max_attempts)
     return None
 
-def parse_member_page(xml_text: str, fallback_page: int) -> Tuple[List[str], Dict[str, int]]:
-    root = ET.fromstring(xml_text)
-    total_pages_text = root.findtext("totalPages")
-    current_page_text = root.findtext("currentPage")
-    try:
-        total_pages = int(total_pages_text) if total_pages_text is not None else 1
-    except ValueError:
-        total_pages = 1
+# Inkrementeller Parser: verarbeitet die Antwort stückweise, verwirft jedes <steamID64> sofort
+# wieder (Speicher unabhängig von der Seitengröße) und sammelt die IDs als uint64
+class MemberPageParser:
+    def __init__(self):
+        self._p = ET.XMLPullParser(events=("start", "end"))
+        self._members: Optional[ET.Element] = None
+        self.ids = array("Q")
+        self.total_pages: Optional[int] = None
+        self.current_page: Optional[int] = None
+        self.member_count: Optional[int] = None
+        self.error: Optional[Exception] = None
+
+    def feed(self, data: bytes) -> None:
+        if self.error is not None:
+            return
+        try:
+            self._p.feed(data)
+            self._drain()
+        except ET.ParseError as e:
+            self.error = e
+
+    def close(self) -> None:
+        if self.error is not None:
+            return
+        try:
+            self._p.close()
+            self._drain()
+        except ET.ParseError as e:
+            self.error = e
+
+    def _drain(self) -> None:
+        for ev, el in self._p.read_events():
+            if ev == "start":
+                if el.tag == "members":
+                    self._members = el
+                continue
+            if el.tag == "steamID64":
+                t = (el.text or "").strip()
+                if t.isdigit() and len(t) <= 20:
+                    try:
+                        self.ids.append(int(t))
+                    except OverflowError:
+                        pass
+                if self._members is not None and len(self._members) and self._members[-1] is el:
+                    self._members.remove(el)
+            elif el.tag == "totalPages":
+                self.total_pages = _parse_int(el.text)
+            elif el.tag == "currentPage":
+                self.current_page = _parse_int(el.text)
+            elif el.tag == "memberCount":
+                self.member_count = _parse_int(el.text)
+
+def _parse_int(text: Optional[str]) -> Optional[int]:
     try:
-        current_page = int(current_page_text) if current_page_text is not None else fallback_page
+        return int((text or "").strip())
     except ValueError:
-        current_page = fallback_page
-    members_elem = root.find("members")
-    members: List[str] = []
-    if members_elem is not None:
-        for sid in members_elem.findall("steamID64"):
-            if sid.text:
-                members.append(sid.text.strip())
-    logging.info("Seite %d/%d → %d IDs", current_page, total_pages, len(members))
-    return members, {"totalPages": total_pages, "currentPage": current_page}
-
-def get_page_members(config: dict, session: requests.Session, base_url: str, page: int) -> Optional[Tuple[List[str], Dict[str, int]]]:
+        return None
+
+def parse_member_chunks(chunks: Iterable[bytes], fallback_page: int) -> Optional[Tuple[array, Dict[str, int]]]:
+    parser = MemberPageParser()
+    for chunk in chunks:
+        if chunk:
+            parser.feed(chunk)
+        if parser.error is not None:
+            break
+    parser.close()
+    if parser.error is not None:
+        # kaputtes/abgeschnittenes XML: ganze Seite verwerfen (kein Teilergebnis, nichts in den Cache),
+        # sonst würde eine kurze Seite gecacht und der Early-Stop den Rest der Gruppe abschneiden
+        logging.warning("XML-Fehler auf Seite %d: %s (%d IDs verworfen)", fallback_page, parser.error, len(parser.ids))
+        return None
+    total_pages = parser.total_pages if parser.total_pages is not None else 1
+    current_page = parser.current_page if parser.current_page is not None else fallback_page
+    logging.info("Seite %d/%d → %d IDs", current_page, total_pages, len(parser.ids))
+    # listed = 0: Antwort ohne Mitgliederliste (Gruppe gelöscht/umbenannt, Fehlerseite)
+    return parser.ids, {"totalPages": total_pages, "currentPage": current_page,
+                        "memberCount": parser.member_count if parser.member_count is not None else len(parser.ids),
+                        "listed": 1 if parser.total_pages is not None else 0}
+
+def parse_member_page(xml: bytes, fallback_page: int) -> Optional[Tuple[array, Dict[str, int]]]:
+    return parse_member_chunks([xml], fallback_page)
+
+# Komprimierten Cache-Eintrag stückweise entpacken
+def iter_decompressed(blob: bytes, chunk_size: int = 1 << 16) -> Iterable[bytes]:
+    d = zlib.decompressobj()
+    for i in range(0, len(blob), chunk_size):
+        data = blob[i:i+chunk_size]
+        while data:
+            buf = d.decompress(data, chunk_size)
+            data = d.unconsumed_tail
+            yield buf
+    yield d.flush()
+
+def get_page_members(config: dict, session: requests.Session, base_url: str, page: int) -> Optional[Tuple[array, Dict[str, int]]]:
     full_url = build_members_url(base_url, page)
-    resp = safe_request(config, session, "GET", full_url, headers=DEFAULT_HEADERS, context=f"GET p={page}")
+    cache = get_page_cache(config)
+    entry = cache.get(full_url) if cache is not None else None
+    headers = DEFAULT_HEADERS
+    if entry is not None:
+        blob, etag, last_modified, age = entry
+        if not etag and not last_modified and age < cache.ttl_s:
+            res = _parse_cached(blob, page)
+            if res is not None:
+                cache.touch(full_url, revalidated=False)
+                stat_add("cache_hit")
+                return res
+        headers = dict(DEFAULT_HEADERS)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    resp = safe_request(config, session, "GET", full_url, headers=headers, context=f"GET p={page}", stream=True)
     if resp is None:
         return None
-    xml_text = resp.text or ""
-    return parse_member_page(xml_text, fallback_page=page)
+    if resp.status_code == 304 and entry is not None:
+        resp.close()
+        res = _parse_cached(entry[0], page)
+        if res is not None:
+            cache.touch(full_url, revalidated=True)
+            stat_add("cache_hit")
+            stat_add("cache_revalidated")
+            return res
+        entry = None
+        resp = safe_request(config, session, "GET", full_url, headers=DEFAULT_HEADERS, context=f"GET p={page}", stream=True)
+        if resp is None:
+            return None
+
+    # Body stückweise parsen; für den Cache parallel komprimieren statt den Klartext zu puffern
+    comp = zlib.compressobj(6) if cache is not None else None
+    parts: List[bytes] = []
+
+    def body_chunks() -> Iterable[bytes]:
+        for chunk in resp.iter_content(chunk_size=1 << 16):
+            if comp is not None:
+                parts.append(comp.compress(chunk))
+            yield chunk
+
+    try:
+        res = parse_member_chunks(body_chunks(), fallback_page=page)
+    except (requests.RequestException, OSError) as e:
+        _ = handle_error(config, None, e, context=f"GET p={page} body")
+        return None
+    finally:
+        resp.close()
+    if metrics_on(config):
+        stat_add("bytes|members", resp.raw.tell())
+    if cache is not None:
+        stat_add("cache_miss")
+        if res is not None:
+            parts.append(comp.flush())
+            cache.put(full_url, b"".join(parts), resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return res
+
+def _parse_cached(blob: bytes, page: int) -> Optional[Tuple[array, Dict[str, int]]]:
+    try:
+        return parse_member_chunks(iter_decompressed(blob), fallback_page=page)
+    except zlib.error:
+        return None
+
+# Seiten first..last mit begrenzter Parallelität laden, Ergebnisse in Seitenreihenfolge liefern.
+# Bricht der Aufrufer ab (Early-Stop), werden ausstehende Seiten verworfen.
+def iter_pages_ordered(config: dict, session: requests.Session, base_url: str, first: int, last: int,
+                       concurrency: int) -> Iterable[Tuple[int, Optional[array]]]:
+    if concurrency <= 1:
+        for p in range(first, last + 1):
+            res = get_page_members(config, session, base_url, p)
+            yield p, (None if res is None else res[0])
+        return
+    ex = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="page")
+    pending: Dict[int, object] = {}
+    next_submit = first
+    try:
+        for p in range(first, last + 1):
+            while next_submit <= last and len(pending) < concurrency:
+                pending[next_submit] = ex.submit(get_page_members, config, session, base_url, next_submit)
+                next_submit += 1
+            fut = pending.pop(p)
+            try:
+                res = fut.result()
+            except Exception as e:
+                _ = handle_error(config, None, e, context=f"GET p={p}")
+                res = None
+            yield p, (None if res is None else res[0])
+    finally:
+        for fut in pending.values():
+            fut.cancel()
+        ex.shutdown(wait=False, cancel_futures=True)
 
 # ---------- Helfer ----------
-def chunks(lst: List[str], size: int) -> Iterable[List[str]]:
+def chunks(items: Iterable[int], size: int) -> Iterable[List[int]]:
     if size <= 0:
-        yield lst
-    else:
-        for i in range(0, len(lst), size):
-            yield lst[i:i+size]
+        yield list(items)
+        return
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
 
-# ---------- Kombinierter Progress ----------
-def run_group_with_single_progress(config: dict, group: str, max_needed: Optional[int],
-                                   cookies: Optional[dict], dry_run: bool, mode: str,
-                                   concurrency: int, referer_mode: str) -> Tuple[int,int,int]:
-    http_cfg = get_cfg(config, "http", {})
-    s = make_session(http_cfg)
+# SteamID64s liegen durchgehend als uint64 in array('Q') vor; Strings nur im POST-Formular.
+# Sortiert + eindeutig ohne Set oder Liste über alle IDs: Läufe zu je _SORT_RUN IDs sortiert in eine
+# gepackte Kopie (nur ein Lauf liegt kurz als Python-Liste vor), dann k-Wege-Merge der Läufe über
+# memoryviews (ohne Kopie) mit Unique im selben Durchgang
+_SORT_RUN = 1 << 16
 
-    members_all: list[str] = []
-    fetched_pages = 0
-    total_pages = 1
+def unique_ids(ids: Iterable[int]) -> array:
+    src = ids if isinstance(ids, array) else array("Q", ids)
+    runs = array("Q")
+    for i in range(0, len(src), _SORT_RUN):
+        runs.extend(sorted(src[i:i + _SORT_RUN]))
+    view = memoryview(runs)
+    buf = array("Q")
+    last = None
+    for x in heapq.merge(*(view[i:i + _SORT_RUN] for i in range(0, len(runs), _SORT_RUN))):
+        if x != last:
+            buf.append(x)
+            last = x
+    view.release()
+    return buf
 
-    first = get_page_members(config, s, group, 1)
-    if first is None:
-        s.close()
-        return (0, 0, 0)
-    m1, meta = first
-    total_pages = int(meta.get("totalPages", 1))
-    members_all.extend(m1)
-    fetched_pages = 1
+# sid in der sortierten, eindeutigen Liste? (Binärsuche statt Hash-Set)
+def in_sorted(ids: array, sid: int) -> bool:
+    i = bisect_left(ids, sid)
+    return i < len(ids) and ids[i] == sid
 
-    if max_needed and len(members_all) >= max_needed:
-        selected = members_all[:max_needed]
-    else:
-        selected = list(dict.fromkeys(members_all))
+# Bereits gesehene IDs beim seitenweisen Laden: sortierte array('Q')-Läufe mit Größen wie die Stellen einer
+# Binärzahl (ein Lauf je Seite, gleich große werden verschmolzen) → ~8 Byte pro ID statt eines Set-Eintrags,
+# Nachschlagen per Binärsuche in höchstens log2(n) Läufen; ein Set gibt es nur für die IDs einer Seite
+class SeenIds:
+    def __init__(self):
+        self.runs: List[array] = []
+        self.n = 0
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("{task.fields[mode]} • {task.fields[group_short]} • p:{task.fields[pages]}/{task.fields[total_pages]} • ids:{task.fields[ids]} • ok:{task.fields[ok]} • err:{task.fields[err]}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        TimeElapsedColumn(),
-        TimeRemainingColumn(),
-        console=console,
-        transient=True,
-    ) as progress:
+    def __len__(self) -> int:
+        return self.n
 
-        group_short = (group if len(group) <= 42 else group[:39] + "…")
-        task = progress.add_task(
-            "Gesamt",
-            total=total_pages,
-            mode=("BLK" if mode == "block" else "UNBLK"),
-            group_short=group_short,
-            pages=1,
-            total_pages=total_pages,
-            ids=len(selected),
-            ok=0,
-            err=0,
+    def __contains__(self, sid: int) -> bool:
+        return any(in_sorted(run, sid) for run in self.runs)
+
+    # Neue IDs einer Seite in Seitenreihenfolge (ohne Doppelte, höchstens bis limit insgesamt) übernehmen
+    def take_new(self, ids: Iterable[int], limit: Optional[int] = None) -> array:
+        ids = ids if isinstance(ids, array) else array("Q", ids)
+        # sortierte Kandidaten der Seite gegen jeden Lauf prüfen (Binärsuche ab der letzten Fundstelle)
+        cand = sorted(set(ids))
+        for run in self.runs:
+            keep = []
+            lo, n = 0, len(run)
+            for sid in cand:
+                lo = bisect_left(run, sid, lo)
+                if lo == n or run[lo] != sid:
+                    keep.append(sid)
+            cand = keep
+            if not cand:
+                break
+        new = set(cand)
+        fresh = array("Q")
+        room = None if limit is None else max(0, limit - self.n)
+        for sid in ids:
+            if room is not None and len(fresh) >= room:
+                break
+            if sid in new:
+                new.discard(sid)
+                fresh.append(sid)
+        if fresh:
+            page = array("Q", cand if len(fresh) == len(cand) else sorted(fresh))
+            # zwei sortierte Läufe: Timsort verschmilzt sie linear
+            while self.runs and len(self.runs[-1]) <= len(page):
+                page = array("Q", sorted(self.runs.pop() + page))
+            self.runs.append(page)
+            self.n += len(fresh)
+        return fresh
+
+# Die ersten n eindeutigen IDs in Seitenreihenfolge (max_per_group)
+def first_unique(ids: Iterable[int], n: int) -> array:
+    seen = SeenIds()
+    out = array("Q")
+    for part in chunks(ids, 1000):
+        out.extend(seen.take_new(part, n))
+        if len(out) >= n:
+            break
+    return out
+
+def select_ids(ids: array, max_needed: Optional[int]) -> array:
+    return first_unique(ids, max_needed) if max_needed else unique_ids(ids)
+
+# ---------- Ledger (bereits verarbeitete SteamIDs) ----------
+# SQLite (WAL) SteamID64 → Modus/Ergebnis/Zeitstempel; Schreiben gebündelt, crash-sicher
+class BlockLedger:
+    _IN_CHUNK = 900  # < SQLITE_MAX_VARIABLE_NUMBER (999 bei alten Builds)
+
+    def __init__(self, path: Path, commit_every: int = 500):
+        self.path = path
+        self.commit_every = max(1, commit_every)
+        self._pending: List[Tuple[int, str, int, float]] = []
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=30.0, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ledger ("
+            " steamid INTEGER PRIMARY KEY,"
+            " mode TEXT NOT NULL,"
+            " ok INTEGER NOT NULL,"
+            " ts REAL NOT NULL"
+            ") WITHOUT ROWID"
         )
+        self.conn.commit()
 
-        if fetched_pages < total_pages and (not max_needed or len(selected) < max_needed):
-            for p in range(2, total_pages + 1):
-                res = get_page_members(config, s, group, p)
-                if res is None:
-                    break
-                mp_ids, _ = res
-                selected.extend(mp_ids)
-                fetched_pages += 1
-                progress.update(task, advance=1, pages=fetched_pages, ids=min(len(selected), max_needed or len(selected)))
-                if len(mp_ids) < 1000 or (max_needed and len(selected) >= max_needed):
-                    break
+    # Entfernt IDs, die im gleichen Modus bereits erfolgreich verarbeitet wurden
+    def filter_new(self, steamids: array, mode: str) -> array:
+        done = array("Q")
+        for i in range(0, len(steamids), self._IN_CHUNK):
+            part = steamids[i:i+self._IN_CHUNK].tolist()
+            marks = ",".join("?" * len(part))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT steamid FROM ledger WHERE ok=1 AND mode=? AND steamid IN ({marks})",
+                    [mode, *part],
+                ).fetchall()
+            done.extend(r[0] for r in rows)
+        if not done:
+            return steamids
+        done = unique_ids(done)
+        return array("Q", (x for x in steamids if not in_sorted(done, x)))
 
-    s.close()
+    def record(self, steamid: int, mode: str, ok: bool) -> None:
+        self._pending.append((steamid, mode, 1 if ok else 0, time.time()))
+        if len(self._pending) >= self.commit_every:
+            self.flush()
 
-    selected = list(dict.fromkeys(selected))
-    if max_needed:
-        selected = selected[:max_needed]
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO ledger(steamid, mode, ok, ts) VALUES (?,?,?,?) "
+                "ON CONFLICT(steamid) DO UPDATE SET mode=excluded.mode, ok=excluded.ok, ts=excluded.ts",
+                self._pending,
+            )
+        self._pending.clear()
 
-    ok = 0
-    err = 0
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
 
-    block_cfg = get_cfg(config, "block", {})
-    batch_size = int(get_cfg(block_cfg, "batch_size", 50))
-    fail_max = int(get_cfg(block_cfg, "breaker_fail_max", 10))
-    err_rate_max = float(get_cfg(block_cfg, "breaker_error_rate", 0.3))
-    per_task_to = float(get_cfg(block_cfg, "per_task_timeout_seconds", 30.0))
-    wait_to = float(get_cfg(block_cfg, "executor_wait_timeout_seconds", 30.0))
-    fallback_seq = bool(get_cfg(block_cfg, "fallback_to_sequential", True))
+def open_ledger(config: dict) -> Optional[BlockLedger]:
+    ledger_cfg = get_cfg(config, "ledger", {})
+    if not bool(get_cfg(ledger_cfg, "enabled", True)):
+        return None
+    path = Path(str(get_cfg(ledger_cfg, "path", "ledger.sqlite3"))).expanduser().resolve()
+    commit_every = int(get_cfg(ledger_cfg, "commit_every", 500))
+    try:
+        return BlockLedger(path, commit_every=commit_every)
+    except sqlite3.Error as e:
+        logging.error("Ledger nicht nutzbar (%s): %s", path, e)
+        return None
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("{task.fields[mode]} • {task.fields[group_short]} • p:{task.fields[pages]}/{task.fields[total_pages]} • ids:{task.fields[ids]} • ok:{task.fields[ok]} • err:{task.fields[err]}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        TimeElapsedColumn(),
-        TimeRemainingColumn(),
-        console=console,
-        transient=True,
-    ) as progress:
-        task = progress.add_task(
-            "Gesamt",
-            total=total_pages + len(selected),
-            mode=("BLK" if mode == "block" else "UNBLK"),
-            group_short=(group if len(group) <= 42 else group[:39] + "…"),
-            pages=total_pages,
-            total_pages=total_pages,
-            ids=len(selected),
-            ok=0,
-            err=0,
+# ---------- Retry-Queue (fehlgeschlagene IDs) ----------
+# Fehlgeschlagene IDs mit Versuchszähler und nächstem Versuchszeitpunkt (exponentiell: base·2^n, max. max_delay).
+# Wird am Laufende abgearbeitet und bleibt für den nächsten Aufruf erhalten; nach max_attempts aufgegeben.
+class RetryQueue:
+    _FLUSH_EVERY = 200
+
+    def __init__(self, path: Path, max_attempts: int = 5, base_delay: float = 30.0, max_delay: float = 3600.0):
+        self.path = path
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+        self._failed: List[Tuple[int, str, str]] = []
+        self._deferred: List[Tuple[int, str, str]] = []
+        self._resolved: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=30.0, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS retry ("
+            " steamid INTEGER NOT NULL,"
+            " mode TEXT NOT NULL,"
+            " referer TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL,"
+            " next_ts REAL NOT NULL,"
+            " given_up INTEGER NOT NULL,"
+            " PRIMARY KEY (steamid, mode)"
+            ") WITHOUT ROWID"
         )
+        self.conn.commit()
+        # leere Queue → Erfolge müssen nichts austragen
+        self._maybe_queued = self.conn.execute("SELECT 1 FROM retry LIMIT 1").fetchone() is not None
 
-        if dry_run:
-            for _sid in selected:
-                progress.update(task, advance=1)
-            return (len(selected), 0, 0)
-
-        # Pool-/Concurrency-Kopplung: Concurrency nicht größer als pool_maxsize
-        pool_size = int(get_cfg(http_cfg, "pool_maxsize", 50))
-        current_conc = max(1, min(concurrency, pool_size))
-
-        sblk = make_session(http_cfg)
-        fail_streak = 0
-
-        def block_user_web(steamid: str) -> bool:
-            url = "https://steamcommunity.com/actions/BlockUserAjax"
-            referer = group if (referer_mode == "group" and group) else f"https://steamcommunity.com/profiles/{steamid}"
-            headers = {
-                "User-Agent": DEFAULT_HEADERS["User-Agent"],
-                "Referer": referer,
-                "Origin": "https://steamcommunity.com",
-                "Accept": "application/json, text/javascript, */*; q=0.01",
-                "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            }
-            form = {
-                "sessionID": (cookies or {}).get("sessionid", ""),
-                "steamid": str(steamid),
-                "block": "1" if mode == "block" else "0",
-                "ajax": "1",
-                "json": "1",
-            }
-            resp = safe_request(config, sblk, "POST", url, headers=headers, cookies=cookies, data=form,
-                                context=f"POST sid={steamid} {mode}")
-            if resp is None:
-                return False
-            ok_local = resp.ok
-            try:
-                if resp.headers.get("Content-Type", "").startswith("application/json"):
-                    js = resp.json()
-                    ok_local = ok_local and bool(js.get("success", True))
-            except Exception:
-                pass
-            return ok_local
+    def fail(self, steamid: int, mode: str, referer: str) -> None:
+        with self._lock:
+            self._failed.append((steamid, mode, referer))
+            self._maybe_queued = True
+        if len(self._failed) >= self._FLUSH_EVERY:
+            self.flush()
 
-        for batch in chunks(selected, batch_size):
-            if current_conc <= 1:
-                for sid in batch:
-                    success = block_user_web(sid)
-                    if success:
-                        ok += 1
-                        fail_streak = 0
-                    else:
-                        err += 1
-                        fail_streak += 1
-                    progress.update(task, advance=1, ok=ok, err=err)
-                    if fail_streak >= fail_max:
-                        logging.warning("Breaker open: fail_streak=%d >= %d → Gruppe abgebrochen", fail_streak, fail_max)
-                        sblk.close()
-                        return (len(selected), ok, err)
-            else:
-                with ThreadPoolExecutor(max_workers=current_conc) as ex:
-                    futures = [ex.submit(block_user_web, sid) for sid in batch]
-                    done, not_done = wait(futures, timeout=wait_to, return_when=FIRST_COMPLETED)
-                    if not_done:
-                        done2, not_done2 = wait(not_done, timeout=wait_to)
-                        done = set(list(done) + list(done2))
-                        not_done = not_done2
-
-                    for fut in done:
-                        success = False
-                        try:
-                            success = fut.result(timeout=per_task_to)
-                        except Exception as e:
-                            _ = handle_error(config, None, e, context="worker result")
-                            success = False
-                        if success:
-                            ok += 1
-                            fail_streak = 0
-                        else:
-                            err += 1
-                            fail_streak += 1
-                        progress.update(task, advance=1, ok=ok, err=err)
-                        if fail_streak >= fail_max:
-                            logging.warning("Breaker open: fail_streak=%d >= %d → Gruppe abgebrochen", fail_streak, fail_max)
-                            sblk.close()
-                            return (len(selected), ok, err)
-
-                    for fut in not_done:
-                        fut.cancel()
-                        err += 1
-                        fail_streak += 1
-                        progress.update(task, advance=1, ok=ok, err=err)
-                        if fail_streak >= fail_max:
-                            logging.warning("Breaker open: fail_streak=%d >= %d → Gruppe abgebrochen", fail_streak, fail_max)
-                            sblk.close()
-                            return (len(selected), ok, err)
-
-            total_so_far = ok + err
-            err_rate = (err / total_so_far) if total_so_far else 0.0
-            if err_rate > err_rate_max:
-                logging.warning("Hohe Fehlerquote %.0f%% > %.0f%%", err_rate*100, err_rate_max*100)
-                if fallback_seq and current_conc > 1:
-                    logging.info("Downgrade: Parallelität %d → 1 (sequentiell)", current_conc)
-                    current_conc = 1
-                else:
-                    logging.info("Gruppe wird beendet (Stabilität).")
-                    sblk.close()
-                    return (len(selected), ok, err)
+    # nie versuchte IDs (Gruppe abgebrochen): sofort fällig, ohne Versuch zu zählen
+    def defer(self, steamid: int, mode: str, referer: str) -> None:
+        with self._lock:
+            self._deferred.append((steamid, mode, referer))
+            self._maybe_queued = True
+        if len(self._deferred) >= self._FLUSH_EVERY:
+            self.flush()
 
-        sblk.close()
-        return (len(selected), ok, err)
+    def resolve(self, steamid: int, mode: str) -> None:
+        if self._maybe_queued:
+            with self._lock:
+                self._resolved.append((steamid, mode))
+            if len(self._resolved) >= self._FLUSH_EVERY:
+                self.flush()
 
-# ---------- I/O ----------
-def read_groups_file(path: Path) -> List[str]:
-    groups: List[str] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        s = line.strip()
-        if not s or s.startswith("#"):
-            continue
-        groups.append(s)
-    logging.info("Datei %s → %d Gruppen", path.name, len(groups))
-    return groups
+    def flush(self) -> None:
+        with self._lock:
+            failed, self._failed = self._failed, []
+            deferred, self._deferred = self._deferred, []
+            resolved, self._resolved = self._resolved, []
+        if not failed and not deferred and not resolved:
+            return
+        now = time.time()
+        with self.conn:
+            if deferred:
+                self.conn.executemany(
+                    "INSERT INTO retry(steamid, mode, referer, attempts, next_ts, given_up) VALUES (?,?,?,0,?,0) "
+                    "ON CONFLICT(steamid, mode) DO NOTHING",
+                    [(sid, md, ref, now) for sid, md, ref in deferred],
+                )
+            if resolved:
+                self.conn.executemany("DELETE FROM retry WHERE steamid=? AND mode=?", resolved)
+            if failed:
+                self.conn.executemany(
+                    "INSERT INTO retry(steamid, mode, referer, attempts, next_ts, given_up) VALUES (?,?,?,1,?,?) "
+                    "ON CONFLICT(steamid, mode) DO UPDATE SET attempts=attempts+1, referer=excluded.referer,"
+                    " next_ts=? + min(?, ? * (1 << min(attempts, 30))), given_up=(attempts+1 >= ?)",
+                    [(sid, md, ref, now + self.base_delay, 1 if self.max_attempts <= 1 else 0,
+                      now, self.max_delay, self.base_delay, self.max_attempts) for sid, md, ref in failed],
+                )
 
-# ---------- Top-level Worker für Spawn (Windows) ----------
-def group_worker_entry(q: mp.Queue, cfg: dict, grp: str, need, cks: Optional[dict],
-                       dr: bool, md: str, conc: int, ref: str):
-    try:
-        res = run_group_with_single_progress(cfg, grp, need, cks, dr, md, conc, ref)
-    except Exception as e:
-        logging.error("Group worker exception: %s", e)
-        res = (0, 0, 0)
-    try:
-        q.put(res)
-    except Exception:
-        pass
+    # fällige IDs (sortiert) + Referer je ID
+    def due(self, mode: str) -> Tuple[array, Dict[int, str]]:
+        ids = array("Q")
+        refs: Dict[int, str] = {}
+        for sid, ref in self.conn.execute(
+                "SELECT steamid, referer FROM retry WHERE mode=? AND given_up=0 AND next_ts<=? ORDER BY steamid",
+                (mode, time.time())):
+            ids.append(sid)
+            if ref:
+                refs[sid] = ref
+        return ids, refs
 
-# ---------- Gruppenlauf mit Watchdog ----------
-def run_group_with_watchdog(config: dict, group: str, max_needed: Optional[int], cookies: Optional[dict],
-                            dry_run: bool, mode: str, concurrency: int, referer_mode: str) -> Tuple[int,int,int]:
-    general = get_cfg(config, "general", {})
-    group_to = int(get_cfg(general, "group_timeout_seconds", 600))
-    ctx = mp.get_context("spawn")
-    q: mp.Queue = ctx.Queue()
-    p = ctx.Process(
-        target=group_worker_entry,
-        args=(q, config, group, max_needed, cookies, dry_run, mode, concurrency, referer_mode),
-    )
-    p.start()
-    p.join(group_to)
-    if p.is_alive():
-        logging.error("Watchdog: group timeout (%ds) → Terminate %s", group_to, group)
-        p.terminate()
-        p.join(5)
-        return (0, 0, 0)
+    # Zeitpunkt des nächsten fälligen Versuchs (None = nichts mehr offen)
+    def next_due(self, mode: str) -> Optional[float]:
+        row = self.conn.execute("SELECT min(next_ts) FROM retry WHERE mode=? AND given_up=0", (mode,)).fetchone()
+        return row[0] if row else None
+
+    def pending(self, mode: str) -> int:
+        return self.conn.execute("SELECT count(*) FROM retry WHERE mode=? AND given_up=0", (mode,)).fetchone()[0]
+
+    # aufgegebene IDs einmal melden und austragen (ein späterer Fehlschlag beginnt wieder bei 1 Versuch)
+    def take_given_up(self, mode: str) -> List[Tuple[int, int]]:
+        with self.conn:
+            rows = self.conn.execute("SELECT steamid, attempts FROM retry WHERE mode=? AND given_up=1 ORDER BY steamid",
+                                     (mode,)).fetchall()
+            self.conn.execute("DELETE FROM retry WHERE mode=? AND given_up=1", (mode,))
+        return rows
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+def open_retry_queue(config: dict) -> Optional[RetryQueue]:
+    retry_cfg = get_cfg(config, "retry", {})
+    if not bool(get_cfg(retry_cfg, "enabled", True)):
+        return None
+    path = Path(str(get_cfg(retry_cfg, "path", "retry.sqlite3"))).expanduser().resolve()
     try:
-        return q.get_nowait()
-    except Exception:
-        return (0, 0, 0)
+        return RetryQueue(path, max_attempts=int(get_cfg(retry_cfg, "max_attempts", 5)),
+                          base_delay=float(get_cfg(retry_cfg, "base_delay_seconds", 30.0)),
+                          max_delay=float(get_cfg(retry_cfg, "max_delay_seconds", 3600.0)))
+    except sqlite3.Error as e:
+        logging.error("Retry-Queue nicht nutzbar (%s): %s", path, e)
+        return None
 
-# ---------- Hauptablauf ----------
-def process_groups(config: dict, groups: Iterable[str], max_per_group: int,
-                   sessionid: Optional[str], steam_login_secure: Optional[str],
-                   dry_run: bool, mode: str, concurrency: int, referer_mode: str) -> None:
-    total_selected = total_ok = total_err = 0
-    cookies = {"sessionid": sessionid, "steamLoginSecure": steam_login_secure} if (sessionid and steam_login_secure) else None
-    if cookies is None:
-        dry_run = True
-        logging.warning("Keine Cookies → DRY RUN")
+# ---------- Work-Queue (verteiltes Blocken) ----------
+# Gemeinsame SQLite-Datei (lokal oder auf einem geteilten Laufwerk): der Koordinator legt einen Job mit den
+# deduplizierten IDs in Plan-Reihenfolge an, Worker-Prozesse (auch auf anderen Rechnern) leasen Blöcke,
+# melden Ergebnisse und verlängern ihre Leases per Heartbeat. Abgelaufene Leases (Worker abgestürzt/weg)
+# gehen zurück in die Queue; nach max_attempts Leases wird eine ID aufgegeben.
+class WorkQueue:
+    PENDING, LEASED, OK, FAILED, ABANDONED = range(5)
 
-    for group in groups:
-        console.rule(f"[bold]{('BLK' if mode=='block' else 'UNBLK')}[/] {group}")
-        selected, ok, err = run_group_with_watchdog(
-            config=config,
-            group=group,
-            max_needed=(max_per_group if max_per_group > 0 else None),
-            cookies=cookies,
-            dry_run=dry_run,
-            mode=mode,
-            concurrency=concurrency,
-            referer_mode=referer_mode,
+    def __init__(self, path: Path, journal: str = "wal", lease_s: float = 120.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_s = max(5.0, lease_s)
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Transaktionen explizit (BEGIN IMMEDIATE), damit die Lease-Vergabe zwischen Prozessen atomar ist
+        self.conn = sqlite3.connect(str(path), timeout=60.0, check_same_thread=False, isolation_level=None)
+        # WAL braucht Shared Memory → auf Netzlaufwerken (NFS/SMB) journal = "delete"
+        self.conn.execute(f"PRAGMA journal_mode={'WAL' if journal == 'wal' else 'DELETE'}")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS job ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, mode TEXT NOT NULL, groups TEXT NOT NULL, key TEXT NOT NULL,"
+            " total INTEGER NOT NULL, created REAL NOT NULL, closed INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS work ("
+            " job INTEGER NOT NULL, seq INTEGER NOT NULL, steamid INTEGER NOT NULL, gi INTEGER NOT NULL,"
+            " state INTEGER NOT NULL, owner TEXT, lease_until REAL, attempts INTEGER NOT NULL,"
+            " PRIMARY KEY (job, seq)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS work_state ON work(job, state, seq);"
+            "CREATE TABLE IF NOT EXISTS worker ("
+            " job INTEGER NOT NULL, name TEXT NOT NULL, host TEXT NOT NULL, last_seen REAL NOT NULL,"
+            " ok INTEGER NOT NULL, err INTEGER NOT NULL, PRIMARY KEY (job, name)) WITHOUT ROWID;"
         )
-        total_selected += selected
-        total_ok += ok
-        total_err += err
 
-    logging.info("Fertig: sel=%d ok=%d err=%d", total_selected, total_ok, total_err)
+    @contextmanager
+    def _tx(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
 
-# ---------- Main ----------
-def main():
-    config_path = Path(os.getenv("CONFIG_PATH", "config.toml")).resolve()
-    cfg = load_config(config_path)
+    # Neuer Job (ältere offene Jobs werden geschlossen); ids in Block-Reihenfolge, gis = Gruppenindex je ID
+    def create_job(self, mode: str, groups: List[str], key: str, ids: array, gis: array) -> int:
+        with self._tx() as c:
+            c.execute("UPDATE job SET closed=1 WHERE closed=0")
+            job = c.execute("INSERT INTO job(mode, groups, key, total, created, closed) VALUES (?,?,?,?,?,0)",
+                            (mode, json.dumps(groups), key, len(ids), time.time())).lastrowid
+            c.executemany("INSERT INTO work(job, seq, steamid, gi, state, owner, lease_until, attempts) "
+                          "VALUES (?,?,?,?,0,NULL,NULL,0)",
+                          ((job, i, sid, gi) for i, (sid, gi) in enumerate(zip(ids, gis))))
+        return job
 
-    general = get_cfg(cfg, "general", {})
-    log_level = str(get_cfg(general, "log_level", "INFO")).upper()
+    # offener Job mit gleichem Schlüssel (Modus + Gruppen) → Wiederaufnahme statt Neuanlage
+    def open_job(self, key: str) -> Optional[int]:
+        row = self.conn.execute("SELECT id FROM job WHERE closed=0 AND key=? ORDER BY id DESC LIMIT 1",
+                                (key,)).fetchone()
+        return row[0] if row else None
 
-    FORMAT = "%(message)s"
-    logging.basicConfig(
-        level=getattr(logging, log_level, logging.INFO),
-        format=FORMAT,
-        datefmt="[%X]",
-        handlers=[RichHandler(console=console, markup=True, rich_tracebacks=True)],
-    )
+    # (id, mode, Gruppen, geschlossen) eines Jobs bzw. des neuesten offenen Jobs
+    def job(self, job_id: Optional[int] = None) -> Optional[Tuple[int, str, List[str], bool]]:
+        if job_id is None:
+            row = self.conn.execute("SELECT id, mode, groups, closed FROM job WHERE closed=0 "
+                                    "ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            row = self.conn.execute("SELECT id, mode, groups, closed FROM job WHERE id=?", (job_id,)).fetchone()
+        return (row[0], row[1], json.loads(row[2]), bool(row[3])) if row else None
 
-    # urllib3-Logs dämpfen (Pool-Warnungen unterdrücken)
-    http_cfg = get_cfg(cfg, "http", {})
-    quiet_urllib3_logging(http_cfg)
+    def total(self, job: int) -> int:
+        row = self.conn.execute("SELECT total FROM job WHERE id=?", (job,)).fetchone()
+        return row[0] if row else 0
 
-    groups: List[str] = []
-    groups_file = get_cfg(general, "groups_file", None)
-    group_url = get_cfg(general, "group_url", None)
-    if groups_file:
-        p = Path(groups_file).expanduser().resolve()
-        if not p.exists():
-            logging.error("groups file not found: %s", p)
-            sys.exit(2)
-        groups.extend(read_groups_file(p))
-    if group_url:
-        groups.append(group_url)
-    if not groups:
-        logging.error("Konfiguration ohne Gruppen; setze general.groups_file oder general.group_url")
-        sys.exit(2)
+    # abgelaufene Leases zurück in die Queue (bzw. aufgeben); innerhalb einer Transaktion aufrufen
+    def _reclaim(self, c: sqlite3.Connection, job: int, now: float) -> None:
+        gone = c.execute("UPDATE work SET state=?, owner=NULL WHERE job=? AND state=? AND lease_until<? "
+                         "AND attempts>=?", (self.ABANDONED, job, self.LEASED, now, self.max_attempts)).rowcount
+        back = c.execute("UPDATE work SET state=?, owner=NULL WHERE job=? AND state=? AND lease_until<?",
+                         (self.PENDING, job, self.LEASED, now)).rowcount
+        if back or gone:
+            stat_add("leases_reclaimed", back)
+            logging.warning("Work-Queue: %d abgelaufene Leases zurückgeholt, %d IDs aufgegeben", back, gone)
 
-    max_per_group = int(get_cfg(general, "max_per_group", 0))
-    dry_run = bool(get_cfg(general, "dry_run", False))
+    def reclaim(self, job: int) -> None:
+        with self._tx() as c:
+            self._reclaim(c, job, time.time())
 
-    cookies_cfg = get_cfg(cfg, "cookies", {})
-    use_env = bool(get_cfg(cookies_cfg, "use_env", True))
-    sessionid = os.getenv("SESSIONID") if use_env else get_cfg(cookies_cfg, "sessionid", None)
-    steam_login_secure = os.getenv("STEAMLOGINSECURE") if use_env else get_cfg(cookies_cfg, "steamLoginSecure", None)
-    if not sessionid or not steam_login_secure:
-        logging.warning("Cookies fehlen → DRY RUN")
+    # bis zu n offene IDs an owner vergeben → [(seq, steamid, gi)]; holt vorher abgelaufene Leases zurück
+    def lease(self, job: int, owner: str, n: int) -> List[Tuple[int, int, int]]:
+        now = time.time()
+        with self._tx() as c:
+            self._reclaim(c, job, now)
+            rows = c.execute("SELECT seq, steamid, gi FROM work WHERE job=? AND state=? ORDER BY seq LIMIT ?",
+                             (job, self.PENDING, max(1, n))).fetchall()
+            c.executemany("UPDATE work SET state=?, owner=?, lease_until=?, attempts=attempts+1 WHERE job=? AND seq=?",
+                          [(self.LEASED, owner, now + self.lease_s, job, seq) for seq, _sid, _gi in rows])
+            c.execute("INSERT INTO worker(job, name, host, last_seen, ok, err) VALUES (?,?,?,?,0,0) "
+                      "ON CONFLICT(job, name) DO UPDATE SET last_seen=excluded.last_seen",
+                      (job, owner, socket.gethostname(), now))
+        return rows
+
+    # Leases von owner verlängern (läuft im Heartbeat-Thread)
+    def heartbeat(self, job: int, owner: str) -> None:
+        now = time.time()
+        with self._tx() as c:
+            c.execute("UPDATE work SET lease_until=? WHERE job=? AND owner=? AND state=?",
+                      (now + self.lease_s, job, owner, self.LEASED))
+            c.execute("UPDATE worker SET last_seen=? WHERE job=? AND name=?", (now, job, owner))
+
+    # Ergebnisse [(seq, ok)] melden; zählt auch, wenn die Lease inzwischen an einen anderen Worker ging
+    def complete(self, job: int, owner: str, results: List[Tuple[int, bool]]) -> None:
+        if not results:
+            return
+        n_ok = sum(1 for _seq, ok in results if ok)
+        with self._tx() as c:
+            c.executemany("UPDATE work SET state=?, owner=? WHERE job=? AND seq=? AND state<?",
+                          [(self.OK if ok else self.FAILED, owner, job, seq, self.OK) for seq, ok in results])
+            c.execute("UPDATE worker SET ok=ok+?, err=err+?, last_seen=? WHERE job=? AND name=?",
+                      (n_ok, len(results) - n_ok, time.time(), job, owner))
+
+    # Nicht bearbeitete Leases von owner sofort freigeben (Abbruch) statt auf den Ablauf zu warten
+    def release(self, job: int, owner: str) -> None:
+        with self._tx() as c:
+            c.execute("UPDATE work SET state=?, owner=NULL, attempts=max(0, attempts-1) "
+                      "WHERE job=? AND owner=? AND state=?", (self.PENDING, job, owner, self.LEASED))
+
+    # noch nicht abgeschlossene IDs (offen oder verliehen)
+    def open_items(self, job: int) -> int:
+        return self.conn.execute("SELECT count(*) FROM work WHERE job=? AND state<?", (job, self.OK)).fetchone()[0]
+
+    def counts(self, job: int) -> Counter:
+        return Counter(dict(self.conn.execute("SELECT state, count(*) FROM work WHERE job=? GROUP BY state",
+                                              (job,)).fetchall()))
+
+    def ids(self, job: int, state: int) -> array:
+        return array("Q", (r[0] for r in self.conn.execute("SELECT steamid FROM work WHERE job=? AND state=?",
+                                                           (job, state))))
+
+    # (Name, Host, zuletzt gesehen, ok, err) je Worker
+    def workers(self, job: int) -> List[Tuple[str, str, float, int, int]]:
+        return self.conn.execute("SELECT name, host, last_seen, ok, err FROM worker WHERE job=? ORDER BY name",
+                                 (job,)).fetchall()
+
+    def close_job(self, job: int) -> None:
+        with self._tx() as c:
+            c.execute("UPDATE job SET closed=1 WHERE id=?", (job,))
+
+    def close(self) -> None:
+        self.conn.close()
+
+def open_work_queue(config: dict) -> Optional[WorkQueue]:
+    dist_cfg = get_cfg(config, "distributed", {})
+    path = Path(str(get_cfg(dist_cfg, "path", "workqueue.sqlite3"))).expanduser().resolve()
+    try:
+        return WorkQueue(path, journal=str(get_cfg(dist_cfg, "journal", "wal")).lower(),
+                         lease_s=float(get_cfg(dist_cfg, "lease_seconds", 120.0)),
+                         max_attempts=int(get_cfg(dist_cfg, "max_attempts", 3)))
+    except sqlite3.Error as e:
+        logging.error("Work-Queue nicht nutzbar (%s): %s", path, e)
+        return None
+
+# ---------- Checkpoints (Wiederaufnahme) ----------
+# Pro Gruppe+Modus: geladene Seiten/Mitglieder, bereits bearbeitete IDs, Zähler.
+# Kopf (JSON) atomar geschrieben (tmp + os.replace); Mitglieder und erledigte IDs als append-only uint64-Logs,
+# damit ein Zwischenstand nur die neuen IDs kostet und Watchdog-Kill/Neustart nichts zerstört.
+class Checkpoint:
+    def __init__(self, directory: Path, key: str, interval: float):
+        self.key = key
+        self.path = directory / (hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + ".json")
+        self._members_path = self.path.with_suffix(".members")
+        self._done_path = self.path.with_suffix(".done")
+        self.interval = interval
+        self.pages = 0
+        self.total_pages = 0
+        self.fetch_done = False
+        self.stream_seen = 0        # Streaming: eindeutige IDs der Seiten bis self.pages (max_per_group)
+        self.members = array("Q")
+        self.done = array("Q")      # sortiert; in früheren Läufen erledigte IDs
+        self.selected = 0
+        self.ok = 0
+        self.err = 0
+        self.complete = False
+        self._members_saved = 0
+        self._new_done = array("Q")
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._last_save = 0.0
+        self._stop = threading.Event()
+        self._saver: Optional[threading.Thread] = None
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # uint64-Log lesen; ein beim Kill halb geschriebener Rest (bzw. alles ab limit) wird abgeschnitten
+    @staticmethod
+    def _read_log(path: Path, limit: Optional[int] = None) -> array:
+        arr = array("Q")
+        try:
+            with path.open("r+b") as f:
+                data = f.read()
+                n = len(data) // 8 if limit is None else min(limit, len(data) // 8)
+                if n * 8 != len(data):
+                    f.truncate(n * 8)
+        except OSError:
+            return arr
+        arr.frombytes(data[:n * 8])
+        return arr
+
+    def load(self) -> bool:
+        try:
+            st = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if st.get("key") != self.key:
+            return False
+        self.pages = int(st.get("pages", 0))
+        self.total_pages = int(st.get("total_pages", 0))
+        self.fetch_done = bool(st.get("fetch_done", False))
+        self.stream_seen = int(st.get("stream_seen", 0))
+        self.members = self._read_log(self._members_path, int(st.get("members", 0)))
+        self._members_saved = len(self.members)
+        self.done = unique_ids(self._read_log(self._done_path))
+        self.selected = int(st.get("selected", 0))
+        self.ok = int(st.get("ok", 0))
+        self.err = int(st.get("err", 0))
+        self.complete = bool(st.get("complete", False))
+        return True
+
+    # Ergebnis einer ID (aus dem Block-Loop; nur anhängen, geschrieben wird später)
+    def mark_done(self, sid: int, selected: int, ok: int, err: int) -> None:
+        with self._lock:
+            self._new_done.append(sid)
+            self.selected, self.ok, self.err = selected, ok, err
+
+    # Block-Phase: Zwischenstände im Hintergrund statt im Block-Loop schreiben
+    def start_autosave(self) -> None:
+        if self._saver is None:
+            self._stop.clear()
+            self._saver = threading.Thread(target=self._autosave, name="checkpoint", daemon=True)
+            self._saver.start()
+
+    def _autosave(self) -> None:
+        while not self._stop.wait(max(0.5, self.interval)):
+            self._write(sync=False)
+
+    # Hintergrund-Schreiber beenden und alles dauerhaft sichern
+    def close(self) -> None:
+        if self._saver is not None:
+            self._stop.set()
+            self._saver.join()
+            self._saver = None
+        self.save(force=True)
+
+    def save(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_save < self.interval:
+            return
+        self._last_save = now
+        self._write(sync=force)
+
+    def _write(self, sync: bool) -> None:
+        with self._io_lock:
+            with self._lock:
+                new_done, self._new_done = self._new_done, array("Q")
+                st = {
+                    "key": self.key,
+                    "pages": self.pages,
+                    "total_pages": self.total_pages,
+                    "fetch_done": self.fetch_done,
+                    "stream_seen": self.stream_seen,
+                    "members": len(self.members),
+                    "selected": self.selected,
+                    "ok": self.ok,
+                    "err": self.err,
+                    "complete": self.complete,
+                }
+            tmp = self.path.with_suffix(".tmp")
+            try:
+                # Logs vor dem Kopf: der Kopf verweist nie auf ungeschriebene Mitglieder
+                if len(self.members) > self._members_saved:
+                    self._append(self._members_path, self.members[self._members_saved:st["members"]], sync)
+                    self._members_saved = st["members"]
+                if new_done:
+                    self._append(self._done_path, new_done, sync)
+                with tmp.open("w", encoding="utf-8") as f:
+                    json.dump(st, f)
+                    if sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except OSError as e:
+                logging.error("Checkpoint nicht geschrieben (%s): %s", self.path, e)
+
+    @staticmethod
+    def _append(path: Path, ids: array, sync: bool) -> None:
+        with path.open("ab") as f:
+            ids.tofile(f)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+def checkpoint_dir(config: dict) -> Path:
+    ck_cfg = get_cfg(config, "checkpoint", {})
+    return Path(str(get_cfg(ck_cfg, "dir", "checkpoints"))).expanduser().resolve()
+
+def open_checkpoint(config: dict, key: str) -> Optional[Checkpoint]:
+    ck_cfg = get_cfg(config, "checkpoint", {})
+    if not bool(get_cfg(ck_cfg, "enabled", True)):
+        return None
+    ckpt = Checkpoint(checkpoint_dir(config), key, float(get_cfg(ck_cfg, "interval_seconds", 10.0)))
+    general = get_cfg(config, "general", {})
+    if bool(get_cfg(general, "resume", False)) and ckpt.load():
+        logging.info("Checkpoint geladen: %s (Seiten %d/%d, erledigt %d)", key, ckpt.pages, ckpt.total_pages, len(ckpt.done))
+    return ckpt
+
+# Zwischenstand lesen (z. B. nach Watchdog-Kill), unabhängig von --resume
+def peek_checkpoint(config: dict, key: str) -> Optional[Checkpoint]:
+    ck_cfg = get_cfg(config, "checkpoint", {})
+    if not bool(get_cfg(ck_cfg, "enabled", True)):
+        return None
+    ckpt = Checkpoint(checkpoint_dir(config), key, 0.0)
+    return ckpt if ckpt.load() else None
+
+def clear_checkpoints(config: dict) -> None:
+    d = checkpoint_dir(config)
+    if not d.is_dir():
+        return
+    for f in d.iterdir():
+        if f.suffix not in (".json", ".members", ".done", ".tmp"):
+            continue
+        try:
+            f.unlink()
+        except OSError:
+            pass
+
+# ---------- Streaming: Fetch → Block ----------
+# Producer-Thread lädt Seiten, dedupliziert, filtert gegen das Ledger und füllt eine begrenzte Queue,
+# die der Block-Teil direkt abarbeitet (erste Blocks schon während weitere Seiten laden)
+class MemberFeed:
+    _END = object()
+
+    def __init__(self, config: dict, group: str, max_needed: Optional[int], mode: str,
+                 ledger: Optional[BlockLedger], queue_size: int, exclude: Optional[array] = None,
+                 ckpt: Optional[Checkpoint] = None):
+        self.config = config
+        self.exclude = exclude
+        self.group = group
+        self.max_needed = max_needed
+        self.mode = mode
+        self.ledger = ledger
+        # Wiederaufnahme: Seiten bis ckpt.pages sind vollständig bearbeitet und werden nicht erneut geladen
+        self.start_page = ckpt.pages if ckpt is not None and ckpt.total_pages else 0
+        self.seen_base = ckpt.stream_seen if self.start_page else 0
+        self.pages = self.start_page
+        self.total_pages = ckpt.total_pages if self.start_page else 1
+        self.selected = 0
+        self.skipped = 0
+        self.failed = False
+        # je geladener Seite (Seite, eingereihte IDs bis hier, eindeutige IDs bis hier) → Seiten-Cursor im Checkpoint
+        self.page_ends: List[Tuple[int, int, int]] = []
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="feed", daemon=True)
+
+    def start(self) -> "MemberFeed":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            while True:
+                self._q.get_nowait()
+        except queue.Empty:
+            pass
+        self._thread.join(5)
+        # evtl. noch wartende Konsumenten wecken
+        try:
+            self._q.put_nowait(self._END)
+        except queue.Full:
+            pass
+
+    # Abbruch durch den Konsumenten: Feed anhalten, schon eingereihte IDs zurückgeben
+    def cancel(self) -> array:
+        self._stop.set()
+        self._thread.join(5)
+        rest = array("Q")
+        try:
+            while True:
+                item = self._q.get_nowait()
+                if item is not self._END:
+                    rest.append(item)
+        except queue.Empty:
+            pass
+        return rest
+
+    def __iter__(self):
+        while True:
+            item = self._q.get()
+            if item is self._END:
+                return
+            yield item
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _limit_reached(self, seen: SeenIds) -> bool:
+        return bool(self.max_needed) and self.seen_base + len(seen) >= self.max_needed
+
+    def _push_page(self, ids: array, seen: SeenIds) -> bool:
+        fresh = seen.take_new(ids, self.max_needed - self.seen_base if self.max_needed else None)
+        if self.exclude and fresh:
+            before = len(fresh)
+            fresh = array("Q", (sid for sid in fresh if not in_sorted(self.exclude, sid)))
+            self.skipped += before - len(fresh)
+        if self.ledger is not None and fresh:
+            before = len(fresh)
+            fresh = self.ledger.filter_new(fresh, self.mode)
+            self.skipped += before - len(fresh)
+        for sid in fresh:
+            if not self._put(sid):
+                return False
+            self.selected += 1
+        self.page_ends.append((self.pages, self.selected, self.seen_base + len(seen)))
+        return True
+
+    def _run(self) -> None:
+        http_cfg = get_cfg(self.config, "http", {})
+        s = make_session(http_cfg, pool_size_for(self.config))
+        seen = SeenIds()
+        try:
+            if not self.start_page:
+                first = get_page_members(self.config, s, self.group, 1)
+                if first is None:
+                    self.failed = True
+                    return
+                ids, meta = first
+                self.total_pages = int(meta.get("totalPages", 1))
+                self.pages = 1
+                if not self._push_page(ids, seen):
+                    return
+            if self._limit_reached(seen):
+                return
+            page_conc = int(get_cfg(http_cfg, "page_concurrency", 4))
+            for _p, mp_ids in iter_pages_ordered(self.config, s, self.group, self.pages + 1, self.total_pages,
+                                                 page_conc):
+                if self._stop.is_set():
+                    break
+                if mp_ids is None:
+                    # Seite fehlgeschlagen → Gruppe bleibt für --resume offen
+                    self.failed = True
+                    break
+                self.pages += 1
+                if not self._push_page(mp_ids, seen):
+                    break
+                if len(mp_ids) < 1000 or self._limit_reached(seen):
+                    break
+        except Exception as e:
+            logging.error("Feed exception: %s", e)
+            self.failed = True
+        finally:
+            s.close()
+            self._put(self._END)
+
+# Gleiche Pipeline, aber die IDs kommen aus einer Datei statt aus Mitgliederseiten
+class IdFileFeed(MemberFeed):
+    _CHUNK = 10000
+
+    def _run(self) -> None:
+        path = Path(self.group)
+        seen = SeenIds()
+        try:
+            n = count_ids(path)
+            if n is not None:
+                self.total_pages = max(1, -(-n // self._CHUNK))
+            if self._limit_reached(seen):
+                return
+            for i, part in enumerate(iter_id_chunks(path, self._CHUNK)):
+                if self._stop.is_set():
+                    break
+                if i < self.start_page:
+                    continue
+                self.pages += 1
+                self.total_pages = max(self.total_pages, self.pages)
+                if not self._push_page(part, seen) or self._limit_reached(seen):
+                    break
+        except Exception as e:
+            logging.error("ID-Datei %s: %s", path, e)
+            self.failed = True
+        finally:
+            self._put(self._END)
+
+def stream_group(config: dict, group: str, max_needed: Optional[int], cookies: Optional[dict],
+                 dry_run: bool, mode: str, concurrency: int, referer_mode: str) -> Tuple[int,int,int]:
+    block_cfg = get_cfg(config, "block", {})
+    queue_size = int(get_cfg(block_cfg, "queue_size", 5000))
+    ckpt = None if dry_run else open_checkpoint(config, f"{mode}|{group}")
+    if ckpt is not None and ckpt.complete:
+        logging.info("Checkpoint: %s bereits abgeschlossen → übersprungen", group)
+        return (ckpt.selected, ckpt.ok, ckpt.err)
+    ledger = open_ledger(config)
+    feed_cls = IdFileFeed if is_id_source(group) else MemberFeed
+    feed = feed_cls(config, group, max_needed, mode, ledger, queue_size,
+                    exclude=(ckpt.done if ckpt is not None else None), ckpt=ckpt).start()
+    try:
+        res = _block_selected(config, group, feed, 0, cookies, dry_run, mode, concurrency, referer_mode,
+                              None if dry_run else ledger, feed=feed, ckpt=ckpt)
+    finally:
+        feed.stop()
+        if ledger is not None:
+            ledger.close()
+    if feed.skipped:
+        logging.info("Ledger: %d bereits erledigt, %d neu", feed.skipped, feed.selected)
+    return res
+
+# ---------- Circuit-Breaker ----------
+# Pro Gruppe: closed → (fail_max Fehler in Folge) → open → (Cooldown) → half-open → (probes Erfolge) → closed;
+# Fehler im half-open öffnen erneut mit verdoppeltem Cooldown (bis cooldown_max_s). Der Dispatcher fragt gate()
+# vor jedem neuen Request, die Arbeit bleibt dabei erhalten.
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, fail_max: int, cooldown_s: float, cooldown_max_s: float, probes: int):
+        self.fail_max = max(1, fail_max)
+        self.cooldown_s = max(0.0, cooldown_s)
+        self.cooldown_max_s = max(self.cooldown_s, cooldown_max_s)
+        self.probes = max(1, probes)
+        self.state = self.CLOSED
+        self.trips = 0
+        self._streak = 0
+        self._cooldown = self.cooldown_s
+        self._open_until = 0.0
+        self._probe_ok = 0
+        self._probe_inflight = 0
+        self._lock = threading.Lock()
+
+    # Sekunden bis zum nächsten erlaubten Request (0 = jetzt); im half-open nur begrenzte Proben
+    def gate(self) -> float:
+        with self._lock:
+            if self.state == self.OPEN:
+                wait_s = self._open_until - time.monotonic()
+                if wait_s > 0:
+                    return wait_s
+                self.state = self.HALF_OPEN
+                self._probe_ok = 0
+                self._probe_inflight = 0
+                logging.info("Breaker half-open: %d Probe-Requests", self.probes)
+            if self.state == self.HALF_OPEN:
+                if self._probe_inflight >= self.probes:
+                    return 0.2
+                self._probe_inflight += 1
+            return 0.0
+
+    # Ende der laufenden Pause (time.monotonic())
+    def open_until(self) -> float:
+        with self._lock:
+            return self._open_until
+
+    # Probe-Freigabe zurückgeben, wenn danach doch kein Request gestartet wurde
+    def cancel_probe(self) -> None:
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_inflight = max(0, self._probe_inflight - 1)
+
+    # True, wenn der Breaker durch diesen Fehler (erneut) geöffnet wurde
+    def record(self, success: bool) -> bool:
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_inflight = max(0, self._probe_inflight - 1)
+                if not success:
+                    self._cooldown = min(self.cooldown_max_s, max(self._cooldown * 2, 1.0))
+                    return self._open()
+                self._probe_ok += 1
+                if self._probe_ok >= self.probes:
+                    self.state = self.CLOSED
+                    self._streak = 0
+                    self._cooldown = self.cooldown_s
+                    logging.info("Breaker closed: Proben erfolgreich → weiter")
+                return False
+            if success:
+                self._streak = 0
+                return False
+            if self.state == self.OPEN:
+                return False
+            self._streak += 1
+            if self._streak >= self.fail_max:
+                return self._open()
+            return False
+
+    def _open(self) -> bool:
+        self.state = self.OPEN
+        self.trips += 1
+        self._streak = 0
+        self._open_until = time.monotonic() + self._cooldown
+        stat_add("breaker_trips")
+        logging.warning("Breaker open (#%d): Pause %.0fs, offene IDs bleiben erhalten", self.trips, self._cooldown)
+        return True
+
+# ---------- Async-Engine (gleitendes Fenster) ----------
+# Hält bis zu get_conc() POSTs gleichzeitig offen und füllt nach jedem fertigen sofort nach
+# (keine Batch-Barrieren). requests ist synchron → ein einziger, dauerhafter Worker-Pool.
+async def block_async(config: dict, work: Iterable[int], block_one: Callable[[int], bool],
+                      get_conc: Callable[[], int], check_every: int, per_task_to: float,
+                      account: Callable[[int, bool], bool], check_error_rate: Callable[[], bool],
+                      breaker: Optional[CircuitBreaker] = None) -> bool:
+    loop = asyncio.get_running_loop()
+    ex = ThreadPoolExecutor(max_workers=max(1, get_conc()), thread_name_prefix="blk")
+    # Streaming-Feed blockiert beim Lesen → nicht im Event-Loop iterieren
+    feeder = None if isinstance(work, (list, array)) else ThreadPoolExecutor(max_workers=1, thread_name_prefix="blk-feed")
+    it = iter(work)
+    inflight: Dict[asyncio.Future, int] = {}
+    exhausted = False
+    since_check = 0
+    try:
+        while True:
+            while not exhausted and len(inflight) < max(1, get_conc()):
+                if breaker is not None:
+                    delay = breaker.gate()
+                    if delay > 0:
+                        if inflight:
+                            break
+                        await asyncio.sleep(min(delay, 1.0))
+                        continue
+                sid = next(it, None) if feeder is None else await loop.run_in_executor(feeder, next, it, None)
+                if sid is None:
+                    if breaker is not None:
+                        breaker.cancel_probe()
+                    exhausted = True
+                    break
+                fut = asyncio.ensure_future(asyncio.wait_for(loop.run_in_executor(ex, block_one, sid), per_task_to))
+                inflight[fut] = sid
+            if not inflight:
+                return True
+            done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+            finished = True
+            for fut in done:
+                sid = inflight.pop(fut)
+                try:
+                    success = bool(fut.result())
+                except Exception as e:
+                    _ = handle_error(config, None, e, context="worker result")
+                    success = False
+                finished = account(sid, success) and finished
+                since_check += 1
+            if not finished:
+                return False
+            if since_check >= max(1, check_every):
+                since_check = 0
+                if not check_error_rate():
+                    return False
+    finally:
+        for fut in inflight:
+            fut.cancel()
+        ex.shutdown(wait=False, cancel_futures=True)
+        if feeder is not None:
+            feeder.shutdown(wait=False, cancel_futures=True)
+
+# ---------- Progress-Anzeige ----------
+PROGRESS_TEXT = ("{task.fields[mode]} • {task.fields[group_short]} • p:{task.fields[pages]}/{task.fields[total_pages]}"
+                 " • ids:{task.fields[ids]} • ok:{task.fields[ok]} • err:{task.fields[err]}"
+                 " • {task.fields[rate]}/s • inflight:{task.fields[inflight]}")
+
+# In Pool-Workern gesetzt: Fortschritt geht an den Hauptprozess statt aufs Terminal
+_PROGRESS_SINK = None
+
+# Ersatz für rich.Progress im Pool-Worker: schickt gedrosselte Snapshots an die Sammelanzeige
+class QueueProgress:
+    def __init__(self, sink, interval: float = 0.25):
+        self.sink = sink
+        self.interval = interval
+        self._tasks: Dict[int, dict] = {}
+        self._last = 0.0
+
+    def __enter__(self) -> "QueueProgress":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._push(force=True)
+        return False
+
+    def add_task(self, description: str, total: Optional[float] = None, **fields) -> int:
+        tid = len(self._tasks)
+        self._tasks[tid] = {"total": total, "completed": 0, **fields}
+        self._push(force=True)
+        return tid
+
+    def update(self, task: int, advance: float = 0, total: Optional[float] = None, **fields) -> None:
+        t = self._tasks[task]
+        t["completed"] += advance
+        if total is not None:
+            t["total"] = total
+        t.update(fields)
+        self._push()
+
+    def _push(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not self._tasks or (not force and now - self._last < self.interval):
+            return
+        self._last = now
+        try:
+            self.sink.put_nowait((os.getpid(), dict(self._tasks[max(self._tasks)])))
+        except Exception:
+            pass
+
+# plain-Modus: statt Balken alle interval Sekunden eine Zeile mit Stand und Durchsatz (erste Aufgabe)
+class PlainProgress(QueueProgress):
+    def __init__(self, interval: float):
+        super().__init__(None, interval)
+        self._start = self._last = time.monotonic()
+        self._last_done = 0.0
+        self._final = False
+
+    def __exit__(self, *exc) -> bool:
+        self._final = True
+        return super().__exit__(*exc)
+
+    def _push(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not self._tasks or (not force and now - self._last < self.interval):
+            return
+        t = self._tasks[0]
+        done = float(t["completed"])
+        # Schlusszeile: Durchschnitt über die ganze Aufgabe statt letztes Intervall
+        since, base = (self._start, 0.0) if self._final else (self._last, self._last_done)
+        speed = (done - base) / (now - since) if now > since else 0.0
+        self._last, self._last_done = now, done
+        total = t.get("total")
+        parts = [f"{t.get('mode', '')} {t.get('group_short', '')}",
+                 f"{int(done)}/{int(total)}" if total else f"{int(done)}"]
+        if t.get("total_pages") not in (None, "-", 0):
+            parts.append(f"p:{t.get('pages')}/{t.get('total_pages')}")
+        parts += [f"ids:{t.get('ids', 0)}", f"ok:{t.get('ok', 0)}", f"err:{t.get('err', 0)}",
+                  f"{speed:.1f}/s", f"rate:{t.get('rate', '-')}/s", f"inflight:{t.get('inflight', '-')}"]
+        emit(" • ".join(parts))
+
+def make_progress():
+    if _PROGRESS_SINK is not None:
+        return QueueProgress(_PROGRESS_SINK)
+    if output_mode() == "plain":
+        return PlainProgress(float(os.getenv("SGB_PROGRESS_INTERVAL", "10")))
+    from rich.progress import (
+        Progress,
+        SpinnerColumn,
+        BarColumn,
+        TextColumn,
+        TimeElapsedColumn,
+        TimeRemainingColumn,
+        TaskProgressColumn,
+    )
+    return Progress(
+        SpinnerColumn(),
+        TextColumn(PROGRESS_TEXT),
+        BarColumn(),
+        TaskProgressColumn(),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=get_console(),
+        transient=True,
+    )
+
+# ---------- Kombinierter Progress ----------
+def fetch_group_members(config: dict, group: str, max_needed: Optional[int], mode: str,
+                        ckpt: Optional[Checkpoint] = None) -> Optional[Tuple[array, int]]:
+    if ckpt is not None and ckpt.fetch_done:
+        return select_ids(ckpt.members, max_needed), ckpt.total_pages
+    if is_id_source(group):
+        try:
+            return select_ids(load_id_file(Path(group)), max_needed), 1
+        except OSError as e:
+            logging.error("ID-Datei %s: %s", group, e)
+            return None
+
+    http_cfg = get_cfg(config, "http", {})
+    s = make_session(http_cfg, pool_size_for(config))
+
+    # Rohliste aller geladenen IDs (mit Checkpoint direkt dessen Puffer)
+    members_all = ckpt.members if ckpt is not None else array("Q")
+    fetched_pages = 0
+    total_pages = 1
+    page_failed = False
+
+    if ckpt is not None and ckpt.pages > 0:
+        fetched_pages = ckpt.pages
+        total_pages = ckpt.total_pages
+    else:
+        first = get_page_members(config, s, group, 1)
+        if first is None:
+            s.close()
+            return None
+        m1, meta = first
+        total_pages = int(meta.get("totalPages", 1))
+        members_all.extend(m1)
+        fetched_pages = 1
+        if ckpt is not None:
+            ckpt.pages, ckpt.total_pages = 1, total_pages
+            ckpt.save()
+
+    with make_progress() as progress:
+
+        group_short = (group if len(group) <= 42 else group[:39] + "…")
+        task = progress.add_task(
+            "Gesamt",
+            total=total_pages,
+            mode=("BLK" if mode == "block" else "UNBLK"),
+            group_short=group_short,
+            pages=fetched_pages,
+            total_pages=total_pages,
+            ids=len(members_all),
+            ok=0,
+            err=0,
+            **rate_fields(config),
+        )
+
+        if fetched_pages < total_pages and (not max_needed or len(members_all) < max_needed):
+            page_conc = int(get_cfg(http_cfg, "page_concurrency", 4))
+            if max_needed:
+                page_conc = min(page_conc, max(1, -(-(max_needed - len(members_all)) // 1000)))
+            for p, mp_ids in iter_pages_ordered(config, s, group, fetched_pages + 1, total_pages, page_conc):
+                if mp_ids is None:
+                    # ckpt.pages bleibt bei der letzten geladenen Seite → --resume lädt ab p weiter
+                    logging.warning("Seite %d von %s fehlgeschlagen → Liste unvollständig, --resume lädt ab hier",
+                                    p, group)
+                    page_failed = True
+                    break
+                members_all.extend(mp_ids)
+                fetched_pages += 1
+                if ckpt is not None:
+                    ckpt.pages = fetched_pages
+                    ckpt.save()
+                progress.update(task, advance=1, pages=fetched_pages, ids=min(len(members_all), max_needed or len(members_all)),
+                                **rate_fields(config))
+                if len(mp_ids) < 1000 or (max_needed and len(members_all) >= max_needed):
+                    break
+
+    s.close()
+
+    selected = select_ids(members_all, max_needed)
+    if ckpt is not None:
+        ckpt.fetch_done = not page_failed
+        ckpt.save(force=True)
+    return selected, total_pages
+
+def block_with_ledger(config: dict, group: str, selected: array, total_pages: int,
+                      cookies: Optional[dict], dry_run: bool, mode: str, concurrency: int,
+                      referer_mode: str, referer_of: Optional[Callable[[int], str]] = None,
+                      ckpt: Optional[Checkpoint] = None) -> Tuple[int,int,int]:
+    if ckpt is not None and ckpt.done:
+        before = len(selected)
+        selected = array("Q", (sid for sid in selected if not in_sorted(ckpt.done, sid)))
+        logging.info("Checkpoint: %d bereits bearbeitet, %d offen", before - len(selected), len(selected))
+    ledger = open_ledger(config)
+    if ledger is not None:
+        before = len(selected)
+        selected = ledger.filter_new(selected, mode)
+        logging.info("Ledger: %d bereits erledigt, %d neu", before - len(selected), len(selected))
+        if dry_run:
+            ledger.close()
+            ledger = None
+    try:
+        return _block_selected(config, group, selected, total_pages, cookies, dry_run, mode,
+                               concurrency, referer_mode, ledger, referer_of,
+                               ckpt=(None if dry_run else ckpt))
+    finally:
+        if ledger is not None:
+            ledger.close()
+
+def run_group_with_single_progress(config: dict, group: str, max_needed: Optional[int],
+                                   cookies: Optional[dict], dry_run: bool, mode: str,
+                                   concurrency: int, referer_mode: str) -> Tuple[int,int,int]:
+    block_cfg = get_cfg(config, "block", {})
+    if bool(get_cfg(block_cfg, "streaming", False)) or is_id_source(group):
+        return stream_group(config, group, max_needed, cookies, dry_run, mode, concurrency, referer_mode)
+    ckpt = open_checkpoint(config, f"{mode}|{group}")
+    if ckpt is not None and ckpt.complete:
+        logging.info("Checkpoint: %s bereits abgeschlossen → übersprungen", group)
+        return (ckpt.selected, ckpt.ok, ckpt.err)
+    fetched = fetch_group_members(config, group, max_needed, mode, ckpt)
+    if fetched is None:
+        return (0, 0, 0)
+    selected, total_pages = fetched
+    res = block_with_ledger(config, group, selected, total_pages, cookies, dry_run, mode,
+                            concurrency, referer_mode, ckpt=ckpt)
+    if ckpt is not None and ckpt.complete and not ckpt.fetch_done:
+        # Seitenabruf unvollständig → Gruppe nicht als erledigt markieren, --resume lädt die restlichen Seiten
+        ckpt.complete = False
+        ckpt.save(force=True)
+    return res
+
+def _block_selected(config: dict, group: str, selected: Iterable[int], total_pages: int,
+                    cookies: Optional[dict], dry_run: bool, mode: str, concurrency: int,
+                    referer_mode: str, ledger: Optional[BlockLedger],
+                    referer_of: Optional[Callable[[int], str]] = None,
+                    feed: Optional[MemberFeed] = None,
+                    ckpt: Optional[Checkpoint] = None,
+                    on_result: Optional[Callable[[int, bool], None]] = None) -> Tuple[int,int,int]:
+    http_cfg = get_cfg(config, "http", {})
+    # bei Wiederaufnahme zählen die Ergebnisse des abgebrochenen Laufs mit
+    ok = ckpt.ok if ckpt is not None else 0
+    err = ckpt.err if ckpt is not None else 0
+    n_prev = len(ckpt.done) if ckpt is not None else 0
+    n_known = len(selected) if isinstance(selected, (list, array)) else 0
+
+    # Anzahl ausgewählter IDs (beim Streaming erst nach und nach bekannt)
+    def n_sel() -> int:
+        return n_prev + (feed.selected if feed is not None else n_known)
+
+    # Fortschritt beider Stufen: Seiten (Fetch) und ok/err (Block)
+    def fields() -> dict:
+        if feed is None:
+            return rate_fields(config)
+        return {"pages": feed.pages, "total_pages": feed.total_pages, "ids": feed.selected,
+                "total": feed.total_pages + feed.selected, **rate_fields(config)}
+
+    block_cfg = get_cfg(config, "block", {})
+    batch_size = int(get_cfg(block_cfg, "batch_size", 50))
+    fail_max = int(get_cfg(block_cfg, "breaker_fail_max", 10))
+    cooldown_s = float(get_cfg(block_cfg, "breaker_cooldown_seconds", 15.0))
+    cooldown_max_s = float(get_cfg(block_cfg, "breaker_cooldown_max_seconds", 300.0))
+    probes = int(get_cfg(block_cfg, "breaker_probes", 3))
+    max_trips = int(get_cfg(block_cfg, "breaker_max_trips", 10))
+    # ohne jeden Erfolg nicht länger pausieren, als der Watchdog der Gruppe ohnehin erlaubt
+    group_to = float(get_cfg(get_cfg(config, "general", {}), "group_timeout_seconds", 600))
+    max_stall = min(float(get_cfg(block_cfg, "breaker_max_stall_seconds", 120.0)), group_to / 2)
+    requeue_max = int(get_cfg(block_cfg, "breaker_requeue_max", 3))
+    err_rate_max = float(get_cfg(block_cfg, "breaker_error_rate", 0.3))
+    per_task_to = float(get_cfg(block_cfg, "per_task_timeout_seconds", 30.0))
+    wait_to = float(get_cfg(block_cfg, "executor_wait_timeout_seconds", 30.0))
+    fallback_seq = bool(get_cfg(block_cfg, "fallback_to_sequential", True))
+    recover_step = int(get_cfg(block_cfg, "concurrency_recover_step", 0))
+    engine = str(get_cfg(block_cfg, "engine", "threads")).lower()
+
+    with make_progress() as progress:
+        task = progress.add_task(
+            "Gesamt",
+            total=total_pages + n_known,
+            mode=("BLK" if mode == "block" else "UNBLK"),
+            group_short=(group if len(group) <= 42 else group[:39] + "…"),
+            pages=total_pages,
+            total_pages=total_pages,
+            ids=n_known,
+            ok=ok,
+            err=err,
+            **rate_fields(config),
+        )
+
+        if dry_run:
+            for _sid in selected:
+                progress.update(task, advance=1, **fields())
+            return (n_sel(), 0, 0)
+
+        current_conc = max(1, concurrency)
+
+        sblk = make_session(http_cfg, pool_size_for(config, current_conc))
+        retryq = open_retry_queue(config)
+        retry_ref = group if group.startswith(("http://", "https://")) else ""
+        target_conc = current_conc
+        recover_step = recover_step or max(1, target_conc // 4)
+        breaker = CircuitBreaker(fail_max, cooldown_s, cooldown_max_s, probes)
+        streak: List[int] = []      # Fehlschläge der laufenden Serie (noch nicht verbucht)
+        retry: deque = deque()      # nach Breaker-Auslösung erneut einzuplanen
+        unsettled: set = set()      # ausgegeben, aber noch ohne Ergebnis (höchstens Batch/Parallelität)
+        aborted = False
+        attempts: Counter = Counter()
+        win_ok = win_err = 0
+        last_ok = time.monotonic()
+        auth_failed = threading.Event()  # 401/403 oder Login-Weiterleitung: Cookies ungültig, Gruppe sofort beenden
+        base_url = steam_base_url(config)
+        url = f"{base_url}/actions/BlockUserAjax"
+        # Header, Cookies, Timeouts und Form einmal vorbereiten; pro ID nur steamid (und ggf. Referer)
+        prepare_block_session(sblk, cookies, base_url)
+        plan = RequestPlan(config)
+        form_prefix, form_suffix = block_form_template(cookies, mode)
+        profile_prefix = f"{base_url}/profiles/"
+        per_id_referer = referer_mode != "group" or referer_of is not None or not group or is_id_source(group)
+        if not per_id_referer:
+            sblk.headers["Referer"] = group
+
+        def block_user_web(steamid: int) -> bool:
+            if auth_failed.is_set():
+                return False
+            if not per_id_referer:
+                headers = None
+            elif referer_of is not None:
+                headers = {"Referer": referer_of(steamid)}
+            else:
+                headers = {"Referer": f"{profile_prefix}{steamid}"}
+            resp = safe_request(config, sblk, "POST", url, headers=headers,
+                                data=b"%b%d%b" % (form_prefix, steamid, form_suffix),
+                                context=f"POST sid={steamid} {mode}", plan=plan, final_status=(401, 403))
+            if resp is None:
+                return False
+            if resp.status_code in (401, 403) or (resp.history and "/login" in resp.url):
+                if not auth_failed.is_set():
+                    auth_failed.set()
+                    logging.error("Anmeldung abgelehnt (%s) → Cookies abgelaufen? Gruppe wird beendet",
+                                  resp.status_code if resp.status_code in (401, 403) else "Login-Weiterleitung")
+                resp.close()
+                return False
+            ok_local = resp.ok
+            try:
+                if resp.headers.get("Content-Type", "").startswith("application/json"):
+                    js = resp.json()
+                    ok_local = ok_local and bool(js.get("success", True))
+            except Exception:
+                pass
+            return ok_local
+
+        # Endgültiges Ergebnis einer ID (Ledger, Checkpoint, Anzeige)
+        def settle(sid: int, success: bool) -> None:
+            nonlocal ok, err
+            if ledger is not None:
+                ledger.record(sid, mode, success)
+            if success:
+                ok += 1
+                if retryq is not None:
+                    retryq.resolve(sid, mode)
+            else:
+                err += 1
+                if retryq is not None:
+                    retryq.fail(sid, mode, referer_of(sid) if referer_of is not None else retry_ref)
+            if on_result is not None:
+                on_result(sid, success)
+            if ckpt is not None:
+                ckpt.mark_done(sid, n_sel(), ok, err)
+                if feed is not None:
+                    pending_seq.pop(sid, None)
+                    advance_cursor()
+            progress.update(task, advance=1, ok=ok, err=err, **fields())
+
+        # Streaming: Seiten-Cursor = letzte Seite, deren IDs alle verbucht sind (Laufnummer in Feed-Reihenfolge)
+        pending_seq: Dict[int, int] = {}
+        pulled = 0
+        next_cursor = 0.0
+
+        def numbered(ids: Iterable[int]) -> Iterator[int]:
+            nonlocal pulled
+            for sid in ids:
+                pending_seq[sid] = pulled
+                pulled += 1
+                yield sid
+
+        def advance_cursor(force: bool = False) -> None:
+            nonlocal next_cursor
+            now = time.monotonic()
+            if not force and now < next_cursor:
+                return
+            next_cursor = now + 1.0
+            low = min(pending_seq.values()) if pending_seq else pulled
+            page = None
+            for page_no, pushed_end, seen_end in feed.page_ends:
+                if pushed_end > low:
+                    break
+                page = (page_no, seen_end)
+            if page is not None and page[0] > ckpt.pages:
+                ckpt.pages, ckpt.stream_seen = page
+                ckpt.total_pages = feed.total_pages
+
+        # Opfer eines Ausfalls nach dem Cooldown erneut versuchen (begrenzt)
+        def requeue(sid: int) -> None:
+            attempts[sid] += 1
+            if attempts[sid] > requeue_max:
+                settle(sid, False)
+            else:
+                retry.append(sid)
+
+        # Ergebnis verbuchen; False → Breaker zu oft ausgelöst, Gruppe abbrechen (Rest bleibt im Checkpoint offen)
+        def account(sid: int, success: bool) -> bool:
+            nonlocal win_ok, win_err, last_ok
+            if not success and auth_failed.is_set():
+                # nicht als Fehler der ID werten: bleibt offen und kommt beim Abbruch in die Retry-Queue
+                return False
+            unsettled.discard(sid)
+            if success:
+                last_ok = time.monotonic()
+                win_ok += 1
+                breaker.record(True)
+                for failed in streak:
+                    settle(failed, False)
+                streak.clear()
+                settle(sid, True)
+                return True
+            win_err += 1
+            if breaker.state != CircuitBreaker.CLOSED:
+                opened = breaker.record(False)
+                requeue(sid)
+            else:
+                streak.append(sid)
+                opened = breaker.record(False)
+                if opened:
+                    for failed in streak:
+                        requeue(failed)
+                    streak.clear()
+            if opened and max_trips and breaker.trips >= max_trips:
+                logging.warning("Breaker %d× ausgelöst → Gruppe abgebrochen, offene IDs → Retry-Queue",
+                                breaker.trips)
+                return False
+            if opened and breaker.open_until() - last_ok > max_stall:
+                logging.warning("Seit %.0fs kein Erfolg (Breaker %d× ausgelöst) → Gruppe abgebrochen, "
+                                "offene IDs → Retry-Queue", time.monotonic() - last_ok, breaker.trips)
+                return False
+            return True
+
+        # Gruppe vollständig abgearbeitet → --resume überspringt sie
+        def mark_complete() -> None:
+            if ckpt is not None and (feed is None or not feed.failed):
+                ckpt.selected, ckpt.ok, ckpt.err = n_sel(), ok, err
+                ckpt.complete = True
+
+        # Fehlerquote des letzten Fensters: hoch → Parallelität halbieren, niedrig → schrittweise zurück
+        def check_error_rate() -> bool:
+            nonlocal current_conc, win_ok, win_err
+            total = win_ok + win_err
+            if total == 0:
+                return True
+            err_rate = win_err / total
+            win_ok = win_err = 0
+            if err_rate > err_rate_max:
+                logging.warning("Hohe Fehlerquote %.0f%% > %.0f%%", err_rate*100, err_rate_max*100)
+                if fallback_seq and current_conc > 1:
+                    stat_add("downgrades")
+                    logging.info("Downgrade: Parallelität %d → %d", current_conc, max(1, current_conc // 2))
+                    current_conc = max(1, current_conc // 2)
+            elif current_conc < target_conc and err_rate <= err_rate_max / 2:
+                stat_add("upgrades")
+                logging.info("Erholung: Parallelität %d → %d", current_conc, min(target_conc, current_conc + recover_step))
+                current_conc = min(target_conc, current_conc + recover_step)
+            return True
+
+        def issue(sid: int) -> int:
+            if not aborted:
+                unsettled.add(sid)
+            return sid
+
+        # Wiederholungen zwischen die normale Arbeit mischen
+        def with_retries(work: Iterable[int]) -> Iterable[int]:
+            for sid in work:
+                issue(sid)
+                while retry:
+                    yield issue(retry.popleft())
+                yield sid
+            while retry:
+                yield issue(retry.popleft())
+
+        # Gruppe abgebrochen: laufende Serie und Wiederholungen sind echte Fehler (err, Retry-Queue);
+        # nie versuchte IDs kommen ohne Versuchszählung in die Retry-Queue (der Checkpoint hält sie zusätzlich)
+        def abort(src: Iterator[int]) -> None:
+            nonlocal aborted
+            aborted = True
+            for failed in streak:
+                settle(failed, False)
+            streak.clear()
+            while retry:
+                settle(retry.popleft(), False)
+            # Streaming: der Feed-Thread liest evtl. noch aus src → nur die schon eingereihten IDs übernehmen
+            rest = feed.cancel() if feed is not None else array("Q", (sid for sid in src if sid not in unsettled))
+            # schon einmal versucht (Wiederholung im laufenden Batch) → Fehler, sonst unbearbeitet
+            for sid in sorted(unsettled):
+                if attempts[sid]:
+                    settle(sid, False)
+                else:
+                    rest.append(sid)
+            unsettled.clear()
+            if retryq is not None and rest:
+                for sid in rest:
+                    retryq.defer(sid, mode, referer_of(sid) if referer_of is not None else retry_ref)
+                logging.warning("%d unbearbeitete IDs → Retry-Queue", len(rest))
+
+        def wait_gate() -> None:
+            delay = breaker.gate()
+            while delay > 0:
+                time.sleep(min(delay, 1.0))
+                delay = breaker.gate()
+
+        def run_threads(work: Iterable[int]) -> bool:
+            for batch in chunks(work, batch_size):
+                if current_conc <= 1 or breaker.state != CircuitBreaker.CLOSED:
+                    for sid in batch:
+                        wait_gate()
+                        if not account(sid, block_user_web(sid)):
+                            return False
+                else:
+                    with ThreadPoolExecutor(max_workers=current_conc) as ex:
+                        futures = {ex.submit(block_user_web, sid): sid for sid in batch}
+                        done, not_done = wait(futures, timeout=wait_to, return_when=FIRST_COMPLETED)
+                        if not_done:
+                            done2, not_done2 = wait(not_done, timeout=wait_to)
+                            done = set(list(done) + list(done2))
+                            not_done = not_done2
+
+                        results = []
+                        for fut in done:
+                            success = False
+                            try:
+                                success = fut.result(timeout=per_task_to)
+                            except Exception as e:
+                                _ = handle_error(config, None, e, context="worker result")
+                                success = False
+                            results.append((futures[fut], success))
+                        for fut in not_done:
+                            fut.cancel()
+                            results.append((futures[fut], False))
+
+                        # Erfolge zuerst: Fehler am Batch-Ende bilden die Serie, die den Breaker auslöst
+                        results.sort(key=lambda r: not r[1])
+                        # bei Abbruch trotzdem alle fertigen Ergebnisse des Batches verbuchen
+                        finished = True
+                        for sid, success in results:
+                            finished = account(sid, success) and finished
+                        if not finished:
+                            return False
+
+                check_error_rate()
+            return True
+
+        if ckpt is not None:
+            ckpt.start_autosave()
+        try:
+            work: Iterable[int] = numbered(selected) if feed is not None and ckpt is not None else selected
+            while True:
+                src = with_retries(work)
+                if engine == "async":
+                    finished = asyncio.run(block_async(config, src, block_user_web,
+                                                       lambda: current_conc, batch_size, per_task_to,
+                                                       account, check_error_rate, breaker))
+                else:
+                    finished = run_threads(src)
+                if not finished:
+                    abort(src)
+                    return (n_sel(), ok, err)
+                # Serie ohne Auslösung am Ende → echte Fehler; nachträglich Eingeplantes → weiterer Durchgang
+                for failed in streak:
+                    settle(failed, False)
+                streak.clear()
+                if not retry:
+                    break
+                work = array("Q", retry)
+                retry.clear()
+            mark_complete()
+        finally:
+            sblk.close()
+            if retryq is not None:
+                retryq.close()
+            if ckpt is not None:
+                if feed is not None:
+                    advance_cursor(force=True)
+                ckpt.close()
+        return (n_sel(), ok, err)
+
+# ---------- I/O ----------
+# Zeilen sind Gruppen-URLs oder SteamID-Listen (.u64/.ndjson/.ids, relativ zur Datei)
+def read_groups_file(path: Path) -> List[str]:
+    groups: List[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        s = line.strip()
+        if not s or s.startswith("#"):
+            continue
+        if is_id_source(s) and not Path(s).expanduser().is_absolute():
+            s = str((path.parent / s).resolve())
+        groups.append(s)
+    n_files = sum(1 for g in groups if is_id_source(g))
+    logging.info("Datei %s → %d Gruppen, %d ID-Listen", path.name, len(groups) - n_files, n_files)
+    return groups
+
+# ---------- Preflight (Gruppenliste) ----------
+# Vor der eigentlichen Arbeit: URLs vereinheitlichen und Doppelte entfernen, Seite 1 aller Gruppen parallel laden
+# (totalPages, Mitgliederzahl; mit TTL zwischengespeichert), leere/ungültige Gruppen ohne Prozess-Start
+# überspringen und nach Größe sortieren
+def canonical_group_url(url: str) -> str:
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host == "www.steamcommunity.com":
+        host = "steamcommunity.com"
+    path = "/" + "/".join(p for p in parsed.path.split("/") if p and p.lower() != "memberslistxml")
+    scheme = parsed.scheme.lower() or "https"
+    if host == "steamcommunity.com":
+        # Gruppennamen sind bei Steam unabhängig von Groß-/Kleinschreibung
+        scheme, path = "https", path.lower()
+    return urlunparse((scheme, host, path, "", "", ""))
+
+# Seite-1-Metadaten je kanonischer URL als JSON: {"checked", "valid", "members", "pages"}
+class GroupMetaCache:
+    def __init__(self, path: Path, ttl_s: float):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.entries: Dict[str, dict] = {}
+        try:
+            self.entries = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning("Gruppen-Cache unlesbar (%s): %s", path, e)
+
+    def get(self, url: str) -> Optional[dict]:
+        meta = self.entries.get(url)
+        if meta is None or time.time() - float(meta.get("checked", 0)) > self.ttl_s:
+            return None
+        return meta
+
+    def put(self, url: str, meta: dict) -> None:
+        self.entries[url] = {"checked": time.time(), **meta}
+
+    def save(self) -> None:
+        now = time.time()
+        fresh = {u: m for u, m in self.entries.items() if now - float(m.get("checked", 0)) <= self.ttl_s}
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(fresh, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.error("Gruppen-Cache nicht geschrieben (%s): %s", self.path, e)
+
+# Seite 1 einer Gruppe → Metadaten oder None (Abruf fehlgeschlagen, nicht zwischenspeichern)
+def fetch_group_meta(config: dict, session: requests.Session, url: str) -> Optional[dict]:
+    res = get_page_members(config, session, url, 1)
+    if res is None:
+        return None
+    _ids, info = res
+    return {"valid": bool(info["listed"]), "members": int(info["memberCount"]), "pages": int(info["totalPages"])}
+
+def preflight_groups(config: dict, groups: List[str]) -> List[str]:
+    pre_cfg = get_cfg(config, "preflight", {})
+    if not bool(get_cfg(pre_cfg, "enabled", True)):
+        return groups
+
+    entries: List[str] = []
+    seen: Dict[str, str] = {}
+    for g in groups:
+        key = g if is_id_source(g) else canonical_group_url(g)
+        if key in seen:
+            logging.info("Preflight: %s doppelt (wie %s) → übersprungen", g, seen[key])
+            continue
+        seen[key] = g
+        entries.append(key)
+
+    cache = GroupMetaCache(Path(str(get_cfg(pre_cfg, "path", "groups_meta.json"))).expanduser().resolve(),
+                           float(get_cfg(pre_cfg, "ttl_seconds", 21600)))
+    todo = [u for u in entries if not is_id_source(u) and cache.get(u) is None]
+    if todo:
+        n_workers = max(1, min(int(get_cfg(pre_cfg, "concurrency", 8)), len(todo)))
+        s = make_session(get_cfg(config, "http", {}), pool_size_for(config, n_workers))
+        try:
+            with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="preflight") as ex:
+                for url, meta in zip(todo, ex.map(lambda u: fetch_group_meta(config, s, u), todo)):
+                    if meta is not None:
+                        cache.put(url, meta)
+        finally:
+            s.close()
+        cache.save()
+
+    kept: List[str] = []
+    sizes: Dict[str, int] = {}
+    n_invalid = n_empty = 0
+    for url in entries:
+        if is_id_source(url):
+            try:
+                sizes[url] = count_ids(Path(url)) or 0
+            except OSError:
+                sizes[url] = 0
+            kept.append(url)
+            continue
+        meta = cache.get(url)
+        if meta is None:
+            # Ausfall ist kein Beweis für eine tote Gruppe → normal weiter (Worker versucht es erneut)
+            logging.warning("Preflight: Seite 1 von %s nicht ladbar → Gruppe bleibt in der Liste", url)
+            sizes[url] = 0
+        elif not meta["valid"]:
+            logging.warning("Preflight: %s ohne Mitgliederliste (ungültig/gelöscht) → übersprungen", url)
+            n_invalid += 1
+            continue
+        elif meta["members"] <= 0:
+            logging.info("Preflight: %s ist leer → übersprungen", url)
+            n_empty += 1
+            continue
+        else:
+            sizes[url] = meta["members"]
+        kept.append(url)
+
+    order = str(get_cfg(pre_cfg, "order", "size_desc")).lower()
+    if order in ("size_desc", "size_asc"):
+        kept.sort(key=lambda u: sizes[u], reverse=(order == "size_desc"))
+    logging.info("Preflight: %d Einträge → %d Gruppen (%d doppelt, %d ungültig, %d leer, %d aus Cache)",
+                 len(groups), len(kept), len(groups) - len(entries), n_invalid, n_empty,
+                 len(entries) - len(todo) - sum(1 for u in entries if is_id_source(u)))
+    return kept
+
+# ---------- SteamID-Listen (Export/Import) ----------
+# .u64    sortierte uint64 (little-endian) ohne Header, wird per mmap gelesen
+# .ndjson eine Zeile pro ID: {"steamid": "7656…", "group": "…"}
+# .ids    Text, eine SteamID64 pro Zeile (# = Kommentar)
+ID_FILE_SUFFIXES = (".u64", ".ndjson", ".ids")
+
+def is_id_source(entry: str) -> bool:
+    return "://" not in entry and entry.lower().endswith(ID_FILE_SUFFIXES)
+
+# Anzahl IDs ohne die Datei zu lesen (nur .u64), sonst None
+def count_ids(path: Path) -> Optional[int]:
+    if path.suffix.lower() == ".u64":
+        return path.stat().st_size // 8
+    return None
+
+# IDs blockweise als array('Q'); große .u64-Dateien werden gemappt statt eingelesen
+def iter_id_chunks(path: Path, chunk_size: int = 10000) -> Iterable[array]:
+    suffix = path.suffix.lower()
+    if suffix == ".u64":
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size // 8 * 8
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)[:size].cast("Q")
+                try:
+                    for i in range(0, len(view), chunk_size):
+                        out = array("Q", view[i:i + chunk_size])
+                        if sys.byteorder == "big":
+                            out.byteswap()
+                        yield out
+                finally:
+                    view.release()
+        return
+    out = array("Q")
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                out.append(int(json.loads(line)["steamid"]) if suffix == ".ndjson" else int(line))
+            except (ValueError, KeyError, TypeError, OverflowError):
+                logging.warning("%s:%d: keine gültige SteamID64 → übersprungen", path.name, n)
+                continue
+            if len(out) >= chunk_size:
+                yield out
+                out = array("Q")
+    if out:
+        yield out
+
+def load_id_file(path: Path) -> array:
+    ids = array("Q")
+    for part in iter_id_chunks(path):
+        ids.extend(part)
+    return ids
+
+# Sortierte IDs schreiben (atomar); Format nach Endung
+def write_id_file(path: Path, ids: array, group: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix.lower() == ".u64":
+        data = array("Q", ids)
+        if sys.byteorder == "big":
+            data.byteswap()
+        with tmp.open("wb") as f:
+            data.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        with tmp.open("w", encoding="utf-8") as f:
+            for sid in ids:
+                f.write(f'{{"steamid":"{sid}","group":{json.dumps(group)}}}\n')
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def export_name(group: str, fmt: str) -> str:
+    parts = [p for p in urlparse(group).path.split("/") if p and p != "memberslistxml"]
+    stem = "".join(c if c.isalnum() or c in "-_" else "_" for c in (parts[-1] if parts else "gruppe"))[:60]
+    return f"{stem}-{hashlib.sha1(group.encode('utf-8')).hexdigest()[:8]}.{fmt}"
+
+# ---------- Profiling (opt-in) ----------
+# profile.enabled oder SGB_PROFILE=1: jeder Worker-Job läuft unter cProfile (optional tracemalloc).
+# Pro Job eine .prof-Datei (und Top-N-Allokationen) im Ordner neben dem Bericht, am Ende eine
+# zusammengeführte Liste der teuersten Funktionen. Der Ordner wird per SGB_PROFILE_DIR an Worker vererbt.
+def profile_on(config: dict) -> bool:
+    env = os.getenv("SGB_PROFILE")
+    if env is not None:
+        return env.lower() not in ("", "0", "false", "no")
+    return bool(get_cfg(get_cfg(config, "profile", {}), "enabled", False))
+
+def profile_dir(config: dict) -> Path:
+    d = os.getenv("SGB_PROFILE_DIR")
+    if d:
+        return Path(d)
+    return Path(str(get_cfg(get_cfg(config, "metrics", {}), "dir", "reports"))).expanduser() / "profile"
+
+@contextmanager
+def profiled(config: dict, label: str):
+    if not profile_on(config):
+        yield
+        return
+    import cProfile
+    import pstats
+    prof_cfg = get_cfg(config, "profile", {})
+    trace = bool(get_cfg(prof_cfg, "tracemalloc", False))
+    if trace:
+        import tracemalloc
+        tracemalloc.start(int(get_cfg(prof_cfg, "tracemalloc_frames", 1)))
+    # cProfile sieht bis 3.11 nur den eigenen Thread → Block-/Seiten-Threads bekommen je einen eigenen Profiler
+    # (ab 3.12 läuft cProfile über sys.monitoring und erfasst alle Threads)
+    thread_profiles: List[object] = []
+
+    def start_thread_profile(frame, event, arg):
+        sys.setprofile(None)
+        tp = cProfile.Profile()
+        thread_profiles.append(tp)
+        tp.enable()
+
+    if sys.version_info < (3, 12):
+        threading.setprofile(start_thread_profile)
+    pr = cProfile.Profile()
+    pr.enable()
+    try:
+        yield
+    finally:
+        pr.disable()
+        threading.setprofile(None)
+        if trace:
+            # Snapshot vor dem Auswerten, sonst zählen pstats-Allokationen mit
+            snap = tracemalloc.take_snapshot()
+            _cur, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        d = profile_dir(config)
+        stem = "".join(c if c.isalnum() or c in "-_" else "_" for c in label)[:60] + f"-{os.getpid()}"
+        try:
+            d.mkdir(parents=True, exist_ok=True)
+            stats = pstats.Stats(pr)
+            for tp in thread_profiles:
+                stats.add(tp)
+            stats.dump_stats(str(d / f"{stem}.prof"))
+            if trace:
+                top = snap.statistics("lineno")[:int(get_cfg(prof_cfg, "top", 20))]
+                with open(d / f"{stem}.alloc.txt", "w", encoding="utf-8") as f:
+                    f.write(f"# {label} (pid {os.getpid()}), Peak {peak / 1048576:.1f} MiB\n")
+                    for stat in top:
+                        f.write(f"{stat}\n")
+        except (OSError, TypeError, ValueError) as e:
+            logging.error("Profil nicht geschrieben (%s): %s", d, e)
+
+# Alle .prof-Dateien des Laufs zusammenführen (merged.prof) und die teuersten Funktionen ausgeben
+def profile_summary(config: dict) -> None:
+    if not profile_on(config):
+        return
+    import io
+    import pstats
+    d = profile_dir(config)
+    files = sorted(str(f) for f in d.glob("*.prof") if f.name != "merged.prof") if d.is_dir() else []
+    if not files:
+        logging.info("Profiling: keine Profile in %s", d)
+        return
+    try:
+        stats = pstats.Stats(*files)
+        stats.dump_stats(str(d / "merged.prof"))
+    except (OSError, TypeError, ValueError) as e:
+        logging.error("Profile nicht zusammenführbar (%s): %s", d, e)
+        return
+    buf = io.StringIO()
+    stats.stream = buf
+    stats.sort_stats("tottime").print_stats(int(get_cfg(get_cfg(config, "profile", {}), "top", 20)))
+    out(f"Profiling: {len(files)} Jobs → {d / 'merged.prof'}")
+    # Kopfzeilen mit den einzelnen Dateinamen weglassen
+    text = buf.getvalue()
+    out(text[text.find("function calls") - 1:].split("\n", 1)[-1].strip("\n") if "function calls" in text else text)
+
+# ---------- Top-level Worker für Spawn (Windows) ----------
+def group_worker_entry(q: mp.Queue, cfg: dict, grp: str, need, cks: Optional[dict],
+                       dr: bool, md: str, conc: int, ref: str):
+    try:
+        with profiled(cfg, f"group-{grp.rstrip('/').rsplit('/', 1)[-1]}"):
+            res = run_group_with_single_progress(cfg, grp, need, cks, dr, md, conc, ref)
+    except Exception as e:
+        logging.error("Group worker exception: %s", e)
+        res = (0, 0, 0)
+    try:
+        q.put((res, worker_stats()))
+    except Exception:
+        pass
+
+# Mitglieder einer Gruppe laden → (uint64-Bytes, totalPages) oder None
+def fetch_members_packed(cfg: dict, grp: str, need, md: str) -> Optional[Tuple[bytes, int]]:
+    fetched = fetch_group_members(cfg, grp, need, md, open_checkpoint(cfg, f"fetch|{grp}"))
+    return None if fetched is None else (fetched[0].tobytes(), fetched[1])
+
+def union_fetch_entry(q: mp.Queue, cfg: dict, grp: str, need, md: str):
+    try:
+        with profiled(cfg, f"fetch-{grp.rstrip('/').rsplit('/', 1)[-1]}"):
+            res = fetch_members_packed(cfg, grp, need, md)
+    except Exception as e:
+        logging.error("Fetch worker exception: %s", e)
+        res = None
+    try:
+        q.put((res, worker_stats()))
+    except Exception:
+        pass
+
+def union_checkpoint_key(mode: str, groups: List[str], tag: str = "∪") -> str:
+    return f"{mode}|{tag}|" + hashlib.sha1("\n".join(groups).encode("utf-8")).hexdigest()
+
+# Sortierte ID-Menge (uint64-Bytes + Gruppenindex) blocken → (sel, ok, err)
+def block_union_packed(cfg: dict, groups: List[str], union_b: bytes, gidx_b: bytes, cks: Optional[dict],
+                       dr: bool, md: str, conc: int, ref: str, tag: str = "∪",
+                       plan_b: Optional[bytes] = None) -> Tuple[int,int,int]:
+    union = array("Q")
+    union.frombytes(union_b)
+    gidx = array("H")
+    gidx.frombytes(gidx_b)
+    # Arbeitsplan bestimmt die Reihenfolge; die sortierte Vereinigung bleibt für die Referer-Suche
+    selected = union
+    if plan_b is not None:
+        selected = array("Q")
+        selected.frombytes(plan_b)
+
+    # ID-Listen haben keine Gruppenseite → Profil als Referer
+    profile_prefix = f"{steam_base_url(cfg)}/profiles/"
+    referers = [None if is_id_source(g) else g for g in groups]
+
+    def referer_of(steamid: int) -> str:
+        return referers[gidx[bisect_left(union, steamid)]] or f"{profile_prefix}{steamid}"
+
+    ckpt = open_checkpoint(cfg, union_checkpoint_key(md, groups, tag))
+    if ckpt is not None and ckpt.complete:
+        return (ckpt.selected, ckpt.ok, ckpt.err)
+    return block_with_ledger(cfg, f"{tag} {len(groups)} Gruppen", selected, len(groups),
+                             cks, dr, md, conc, ref, referer_of=referer_of if ref == "group" else None, ckpt=ckpt)
+
+def union_block_entry(q: mp.Queue, cfg: dict, groups: List[str], union_b: bytes, gidx_b: bytes,
+                      cks: Optional[dict], dr: bool, md: str, conc: int, ref: str, tag: str = "∪",
+                      plan_b: Optional[bytes] = None):
+    try:
+        with profiled(cfg, "block-" + {"∪": "union", "Δ+": "diff-new", "Δ-": "diff-left"}.get(tag, tag)):
+            res = block_union_packed(cfg, groups, union_b, gidx_b, cks, dr, md, conc, ref, tag, plan_b)
+    except Exception as e:
+        logging.error("Block worker exception: %s", e)
+        res = (0, 0, 0)
+    try:
+        q.put((res, worker_stats()))
+    except Exception:
+        pass
+
+# ---------- Gruppenlauf mit Watchdog ----------
+# Einstieg des Kindprozesses: gelernte Rate des Hauptprozesses übernehmen, dann target(q, *args)
+def watchdog_main(q: mp.Queue, seed: Optional[float], target, args: tuple):
+    if seed:
+        seed_rate(seed)
+    target(q, *args)
+
+def run_with_watchdog(target, args: tuple, timeout_s: int, label: str, default):
+    ctx = mp.get_context("spawn")
+    q: mp.Queue = ctx.Queue()
+    p = ctx.Process(target=watchdog_main, args=(q, rate_seed(), target, args))
+    p.start()
+    # Ergebnis vor join abholen, sonst blockiert der Kindprozess beim Flushen großer Queue-Daten
+    deadline = time.time() + timeout_s
+    res = default
+    msg = None
+    while True:
+        try:
+            msg = q.get(timeout=0.5)
+            break
+        except Exception:
+            pass
+        if not p.is_alive():
+            try:
+                msg = q.get(timeout=1.0)
+            except Exception:
+                pass
+            break
+        if time.time() >= deadline:
+            logging.error("Watchdog: timeout (%ds) → Terminate %s", timeout_s, label)
+            p.terminate()
+            break
+    p.join(5)
+    if msg is not None:
+        res, stats = msg
+        merge_stats(stats)
+    return res
+
+def run_group_with_watchdog(config: dict, group: str, max_needed: Optional[int], cookies: Optional[dict],
+                            dry_run: bool, mode: str, concurrency: int, referer_mode: str) -> Tuple[int,int,int]:
+    general = get_cfg(config, "general", {})
+    group_to = int(get_cfg(general, "group_timeout_seconds", 600))
+    res = run_with_watchdog(
+        group_worker_entry,
+        (config, group, max_needed, cookies, dry_run, mode, concurrency, referer_mode),
+        group_to, group, None,
+    )
+    if res is None:
+        # Teilergebnis aus dem Checkpoint statt (0, 0, 0)
+        ckpt = peek_checkpoint(config, f"{mode}|{group}")
+        res = (ckpt.selected, ckpt.ok, ckpt.err) if ckpt is not None else (0, 0, 0)
+    return res
+
+# ---------- Paralleler Gruppen-Scheduler ----------
+# Langlebige Worker-Prozesse (Import, Config, TLS einmal pro Worker statt pro Gruppe) bekommen Jobs
+# nacheinander über ihre eigene Pipe; Watchdog pro Job, aufgeteiltes Ratenbudget, eine Sammelanzeige im
+# Hauptprozess. Keine mit anderen Workern geteilte Queue: ein per Watchdog beendeter Worker kann keinen
+# fremden Lock halten, er wird samt Pipe verworfen und ersetzt.
+
+# Worker-Seite der Pipe; Fortschritt (QueueProgress) und Ergebnisse teilen sich die Verbindung
+class PipeSink:
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self._lock = threading.Lock()
+
+    def put_nowait(self, item) -> None:
+        self.send(("progress", item))
+
+    def send(self, msg) -> None:
+        with self._lock:
+            self.conn.send(msg)
+
+def pool_worker_main(conn: Connection, rate_share: int):
+    global _PROGRESS_SINK
+    sink = _PROGRESS_SINK = PipeSink(conn)
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            return
+        if item is None:
+            return
+        idx, fn_name, args, seed = item
+        # frischer RateController pro Job (rate_share > 1: Anteil am Budget; 1: eigenes Budget je Job/Account),
+        # Startwert ist die zuletzt im Hauptprozess gelernte Rate
+        set_rate_share(rate_share, seed)
+        try:
+            cfg = args[0] if args and isinstance(args[0], dict) else {}
+            grp = args[1] if len(args) > 1 and isinstance(args[1], str) else str(idx)
+            kind = {"run_group_with_single_progress": "group", "fetch_members_packed": "fetch"}.get(fn_name, fn_name)
+            with profiled(cfg, f"{kind}-{grp.rstrip('/').rsplit('/', 1)[-1]}"):
+                res = globals()[fn_name](*args)
+        except Exception as e:
+            logging.error("Pool worker exception: %s", e)
+            res = None
+        publish_pool_stats()
+        with _STATS_LOCK:
+            stats = dict(RUN_STATS)
+            RUN_STATS.clear()
+        rate = current_rate()
+        if rate is not None:
+            stats["rate_last"] = rate
+        sink.send(("done", idx, res, stats))
+
+def run_pool(config: dict, jobs: List[Tuple[str, str, tuple]], n_workers: int, timeout_s: int,
+             job_stats: Optional[List[dict]] = None, shared_rate: bool = True) -> List[object]:
+    ctx = mp.get_context("spawn")
+    n = max(1, min(n_workers, len(jobs)))
+    rate_share = n if shared_rate else 1
+    todo = deque(range(len(jobs)))
+    out: List[object] = [None] * len(jobs)
+    # Pipe → (Prozess, laufender Job, Startzeit)
+    workers: Dict[Connection, Tuple[mp.Process, int, float]] = {}
+    idle: List[mp.Process] = []
+    lost = 0  # Worker, die vor der Jobannahme weggebrochen sind
+
+    # nächsten Job an den Worker geben, sonst beenden lassen
+    def dispatch(conn: Connection, p: mp.Process) -> None:
+        nonlocal lost
+        if todo:
+            idx = todo.popleft()
+            try:
+                conn.send((idx, jobs[idx][1], jobs[idx][2], rate_seed()))
+            except OSError:
+                # Worker schon weg → Job zurück, Ersatz übernimmt ihn (außer Worker sterben dauernd)
+                todo.appendleft(idx)
+                workers.pop(conn, None)
+                conn.close()
+                p.join(5)
+                lost += 1
+                if lost > n:
+                    logging.error("Keine Worker mehr aktiv → %d Jobs verworfen", len(todo))
+                    todo.clear()
+                else:
+                    spawn()
+                return
+            workers[conn] = (p, idx, time.monotonic())
+            return
+        workers.pop(conn, None)
+        try:
+            conn.send(None)
+        except OSError:
+            pass
+        conn.close()
+        idle.append(p)
+
+    def spawn() -> None:
+        conn, child = ctx.Pipe()
+        p = ctx.Process(target=pool_worker_main, args=(child, rate_share), daemon=True)
+        p.start()
+        child.close()
+        dispatch(conn, p)
+
+    with make_progress() as progress:
+        overall = progress.add_task("Gesamt", total=len(jobs), mode="ALL", group_short=f"{len(jobs)} Gruppen",
+                                    pages="-", total_pages="-", ids=0, ok=0, err=0, **rate_fields(config))
+        rows: Dict[int, int] = {}
+        totals: Dict[Tuple[int, str], dict] = {}
+
+        # Worker samt Pipe verwerfen (Job ohne Ergebnis) und bei offenen Jobs ersetzen
+        def retire(conn: Connection, kill: bool) -> None:
+            p, _idx, _ = workers.pop(conn)
+            if kill:
+                p.terminate()
+            p.join(5)
+            conn.close()
+            progress.update(overall, advance=1)
+            if todo:
+                spawn()
+
+        for _ in range(n):
+            spawn()
+        while workers:
+            for conn in wait_conns(list(workers), timeout=0.2):
+                p, idx, _ = workers[conn]
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    logging.error("Worker beendet während %s", jobs[idx][0])
+                    retire(conn, kill=False)
+                    continue
+                if msg[0] == "progress":
+                    pid, snap = msg[1]
+                    total = snap.pop("total", None)
+                    completed = snap.pop("completed", 0)
+                    if pid not in rows:
+                        rows[pid] = progress.add_task("Gruppe", total=total, completed=completed, **snap)
+                    else:
+                        progress.update(rows[pid], total=total, completed=completed, **snap)
+                    totals[(pid, snap.get("group_short"))] = snap
+                    continue
+                _, idx, res, stats = msg
+                merge_stats(stats)
+                if job_stats is not None:
+                    job_stats[idx] = stats
+                out[idx] = res
+                progress.update(overall, advance=1)
+                dispatch(conn, p)
+            progress.update(overall, ids=sum(int(t.get("ids", 0)) for t in totals.values()),
+                            ok=sum(int(t.get("ok", 0)) for t in totals.values()),
+                            err=sum(int(t.get("err", 0)) for t in totals.values()), **rate_fields(config))
+
+            now = time.monotonic()
+            for conn, (p, idx, started) in list(workers.items()):
+                if now - started > timeout_s:
+                    logging.error("Watchdog: timeout (%ds) → Terminate %s", timeout_s, jobs[idx][0])
+                    retire(conn, kill=True)
+
+    for p in idle:
+        p.join(1)
+        if p.is_alive():
+            p.terminate()
+    return out
+
+# ---------- Gruppenübergreifende Deduplizierung ----------
+# Vereinigung als sortiertes uint64-Array; parallel dazu der Index der ersten Gruppe (Referer)
+# (k-Wege-Merge der sortierten Gruppenlisten, kein Hash über alle IDs)
+def build_union(per_group: List[array]) -> Tuple[array, array]:
+    union = array("Q")
+    gidx = array("H")
+    streams = [_tagged(ids if _is_sorted(ids) else sorted(ids), gi) for gi, ids in enumerate(per_group)]
+    last = None
+    for sid, gi in heapq.merge(*streams):
+        if sid != last:
+            union.append(sid)
+            gidx.append(gi)
+            last = sid
+    return union, gidx
+
+def _tagged(ids: Iterable[int], gi: int) -> Iterable[Tuple[int, int]]:
+    for sid in ids:
+        yield sid, gi
+
+def _is_sorted(ids: array) -> bool:
+    return all(ids[i] < ids[i + 1] for i in range(len(ids) - 1))
+
+# ---------- Arbeitsplan (Reihenfolge im Block-Schritt) ----------
+# IDs in vielen beobachteten Gruppen zuerst, bei Gleichstand neu Beigetretene (nicht im letzten Snapshot),
+# sonst SteamID-Reihenfolge. Bricht ein Lauf ab (Watchdog, Breaker), sind die wichtigsten IDs schon erledigt.
+# Gruppenanzahl je ID der sortierten Vereinigung
+# (ein Durchlauf: Zwei-Zeiger-Merge der Vereinigung gegen den k-Wege-Merge der sortierten Gruppenlisten)
+def membership_counts(union: array, per_group: List[array]) -> array:
+    counts = array("H", bytes(2 * len(union)))
+    i, n = 0, len(union)
+    for sid in heapq.merge(*(ids if _is_sorted(ids) else unique_ids(ids) for ids in per_group)):
+        while i < n and union[i] < sid:
+            i += 1
+        if i == n:
+            break
+        if union[i] == sid:
+            counts[i] += 1
+    return counts
+
+# Vereinigung der letzten Snapshots (bekannte Mitglieder) oder None, wenn es keine gibt
+def snapshot_union(config: dict, groups: List[str]) -> Optional[array]:
+    olds = [old for old in (load_snapshot(config, g) for g in groups) if old is not None]
+    return build_union(olds)[0] if olds else None
+
+# Prioritäts-geordnete Kopie der Vereinigung (Counting-Sort über Stufen 2·Gruppen+neu) oder None (aus)
+def work_plan(config: dict, union: array, per_group: List[array], known: Optional[array] = None,
+              dry_run: bool = False) -> Optional[array]:
+    plan_cfg = get_cfg(config, "plan", {})
+    if not bool(get_cfg(plan_cfg, "enabled", True)) or not union:
+        return None
+    counts = membership_counts(union, per_group)
+    new_first = bool(get_cfg(plan_cfg, "new_first", True)) and known is not None
+    buckets: List[array] = [array("Q") for _ in range(2 * (max(counts) + 1))]
+    j, n_known = 0, len(known) if new_first else 0
+    for sid, c in zip(union, counts):
+        level = 2 * c
+        if new_first:
+            while j < n_known and known[j] < sid:
+                j += 1
+            if not (j < n_known and known[j] == sid):
+                level += 1
+        buckets[level].append(sid)
+    del counts
+
+    plan = array("Q")
+    levels: List[Tuple[int, bool, int]] = []
+    for level in range(len(buckets) - 1, -1, -1):
+        if buckets[level]:
+            levels.append((level // 2, bool(level % 2), len(buckets[level])))
+            plan.extend(buckets[level])
+        buckets[level] = array("Q")
+    logging.info("Arbeitsplan: %d IDs → %s", len(plan),
+                 ", ".join(f"{n}×{g} Gr.{' neu' if new else ''}" for g, new, n in levels[:6])
+                 + (" …" if len(levels) > 6 else ""))
+
+    # Dry-Run: Plan zum Nachsehen als NDJSON (Reihenfolge = Block-Reihenfolge)
+    dump = get_cfg(plan_cfg, "dump", "plan.ndjson")
+    if dry_run and dump:
+        path = Path(str(dump)).expanduser().resolve()
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                pos = 0
+                for groups_n, new, n in levels:
+                    for sid in plan[pos:pos + n]:
+                        f.write(f'{{"steamid":"{sid}","groups":{groups_n},"new":{"true" if new else "false"}}}\n')
+                    pos += n
+            logging.info("Arbeitsplan (Dry-Run) → %s", path)
+        except OSError as e:
+            logging.error("Arbeitsplan nicht schreibbar (%s): %s", path, e)
+    return plan
+
+# Mitgliederlisten aller Gruppen laden (Pool oder je Gruppe mit Watchdog) → (Gruppen, Listen)
+def fetch_groups(config: dict, groups: List[str], max_needed: Optional[int], mode: str,
+                 report: Optional[RunReport] = None) -> Tuple[List[str], List[array]]:
+    general = get_cfg(config, "general", {})
+    group_to = int(get_cfg(general, "group_timeout_seconds", 600))
+
+    fetched_groups: List[str] = []
+    per_group: List[array] = []
+    n_parallel = int(get_cfg(general, "parallel_groups", 1))
+    fetch_stats: List[dict] = [{} for _ in groups]
+    if n_parallel > 1:
+        rule("FETCH", f"{len(groups)} Gruppen ({n_parallel} parallel)")
+        pooled = run_pool(config, [(g, "fetch_members_packed", (config, g, max_needed, mode)) for g in groups],
+                          n_parallel, group_to, fetch_stats)
+    for gi, group in enumerate(groups):
+        if n_parallel > 1:
+            res = pooled[gi]
+        else:
+            rule("FETCH", group)
+            before = dict(RUN_STATS)
+            res = run_with_watchdog(union_fetch_entry, (config, group, max_needed, mode), group_to, group, None)
+            fetch_stats[gi] = stats_delta(before, RUN_STATS)
+        if report is not None:
+            report.add_group(group, "fetch", (0 if res is None else len(res[0]) // 8, 0, 0), fetch_stats[gi])
+        if res is None:
+            logging.warning("Gruppe übersprungen (keine Mitglieder geladen): %s", group)
+            continue
+        ids = array("Q")
+        ids.frombytes(res[0])
+        logging.info("Gruppe %s: %d Mitglieder", group, len(ids))
+        fetched_groups.append(group)
+        per_group.append(ids)
+    return fetched_groups, per_group
+
+# Sortierte ID-Menge einmal blocken/entsperren (Referer = erste Gruppe laut gidx)
+def block_union(config: dict, groups: List[str], union: array, gidx: array, cookies: Optional[dict],
+                dry_run: bool, mode: str, concurrency: int, referer_mode: str,
+                report: Optional[RunReport] = None, tag: str = "∪",
+                plan: Optional[array] = None) -> Tuple[int,int,int]:
+    general = get_cfg(config, "general", {})
+    group_to = int(get_cfg(general, "group_timeout_seconds", 600))
+    rule(("BLK" if mode == "block" else "UNBLK"), f"{tag} {len(groups)} Gruppen")
+    before = dict(RUN_STATS)
+    res = run_with_watchdog(
+        union_block_entry,
+        (config, groups, union.tobytes(), gidx.tobytes(), cookies, dry_run, mode, concurrency, referer_mode, tag,
+         None if plan is None else plan.tobytes()),
+        group_to * max(1, len(groups)), f"{tag} {len(groups)} Gruppen", None,
+    )
+    if res is None:
+        ckpt = peek_checkpoint(config, union_checkpoint_key(mode, groups, tag))
+        res = (len(union), ckpt.ok, ckpt.err) if ckpt is not None else (len(union), 0, 0)
+    if report is not None:
+        report.add_group(f"{tag} {len(groups)} Gruppen", mode, res, stats_delta(before, RUN_STATS))
+    return res
+
+def process_groups_union(config: dict, groups: List[str], max_needed: Optional[int], cookies: Optional[dict],
+                         dry_run: bool, mode: str, concurrency: int, referer_mode: str,
+                         report: Optional[RunReport] = None) -> Tuple[int,int,int]:
+    fetched_groups, per_group = fetch_groups(config, groups, max_needed, mode, report)
+    union, gidx = build_union(per_group)
+    naive = sum(len(ids) for ids in per_group)
+    new_per_group = Counter(gidx)
+    for gi, group in enumerate(fetched_groups):
+        logging.info("Gruppe %s: %d Mitglieder, %d neu für die Vereinigung",
+                     group, len(per_group[gi]), new_per_group[gi])
+    plan = work_plan(config, union, per_group, snapshot_union(config, fetched_groups), dry_run)
+    per_group.clear()
+    logging.info("Vereinigung: %d Gruppen, %d IDs gesamt, %d eindeutig → %d POSTs gespart",
+                 len(fetched_groups), naive, len(union), naive - len(union))
+    if not union:
+        return (0, 0, 0)
+    return block_union(config, fetched_groups, union, gidx, cookies, dry_run, mode, concurrency,
+                       referer_mode, report, plan=plan)
+
+# ---------- Diff-Modus (Mitglieder-Snapshots) ----------
+# Pro Gruppe die sortierte Mitgliederliste des letzten Laufs; Folgeläufe bearbeiten nur die Änderung.
+# Format: Magic + zlib(Abstände der sortierten uint64-IDs) → wenige Bytes pro ID
+SNAPSHOT_MAGIC = b"SGBSNAP1"
+
+def snapshot_path(config: dict, group: str) -> Path:
+    diff_cfg = get_cfg(config, "diff", {})
+    d = Path(str(get_cfg(diff_cfg, "dir", "snapshots"))).expanduser().resolve()
+    return d / (hashlib.sha1(group.encode("utf-8")).hexdigest()[:20] + ".snap")
+
+def pack_snapshot(ids: array) -> bytes:
+    deltas = array("Q", ids)
+    for i in range(len(deltas) - 1, 0, -1):
+        deltas[i] -= deltas[i - 1]
+    return SNAPSHOT_MAGIC + zlib.compress(deltas.tobytes(), 9)
+
+def unpack_snapshot(blob: bytes) -> Optional[array]:
+    if not blob.startswith(SNAPSHOT_MAGIC):
+        return None
+    deltas = array("Q")
+    deltas.frombytes(zlib.decompress(blob[len(SNAPSHOT_MAGIC):]))
+    return array("Q", accumulate(deltas))
+
+def load_snapshot(config: dict, group: str) -> Optional[array]:
+    path = snapshot_path(config, group)
+    try:
+        ids = unpack_snapshot(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, zlib.error, ValueError) as e:
+        logging.warning("Snapshot unlesbar (%s): %s", path, e)
+        return None
+    if ids is None:
+        logging.warning("Snapshot mit unbekanntem Format ignoriert: %s", path)
+    return ids
+
+def save_snapshot(config: dict, group: str, ids: array) -> None:
+    path = snapshot_path(config, group)
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            f.write(pack_snapshot(ids))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.error("Snapshot nicht geschrieben (%s): %s", path, e)
+
+# Sortierter Merge alt/neu (beide sortiert, eindeutig) → (beigetreten, ausgetreten)
+def sorted_diff(old: array, new: array) -> Tuple[array, array]:
+    joined = array("Q")
+    left = array("Q")
+    i = j = 0
+    n_old, n_new = len(old), len(new)
+    while i < n_old and j < n_new:
+        a, b = old[i], new[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            left.append(a)
+            i += 1
+        else:
+            joined.append(b)
+            j += 1
+    left.extend(old[i:])
+    joined.extend(new[j:])
+    return joined, left
+
+# IDs aus ids (mit Gruppenindex), die in keep nicht vorkommen (beide sortiert)
+def sorted_minus(ids: array, gidx: array, keep: array) -> Tuple[array, array]:
+    out = array("Q")
+    out_gidx = array("H")
+    j, n_keep = 0, len(keep)
+    for i, sid in enumerate(ids):
+        while j < n_keep and keep[j] < sid:
+            j += 1
+        if j < n_keep and keep[j] == sid:
+            continue
+        out.append(sid)
+        out_gidx.append(gidx[i])
+    return out, out_gidx
+
+def process_groups_diff(config: dict, groups: List[str], max_needed: Optional[int], cookies: Optional[dict],
+                        dry_run: bool, mode: str, concurrency: int, referer_mode: str,
+                        report: Optional[RunReport] = None) -> Tuple[int,int,int]:
+    diff_cfg = get_cfg(config, "diff", {})
+    unblock_left = bool(get_cfg(diff_cfg, "unblock_left", False)) and mode == "block"
+    if max_needed:
+        logging.info("Diff-Modus: max_per_group wird ignoriert (Snapshots brauchen die vollständige Liste)")
+
+    fetched_groups, per_group = fetch_groups(config, groups, None, mode, report)
+    joined_per_group: List[array] = []
+    left_per_group: List[array] = []
+    old_per_group: List[array] = []
+    for group, ids in zip(fetched_groups, per_group):
+        old = load_snapshot(config, group)
+        if old is not None:
+            old_per_group.append(old)
+        if old is None:
+            joined, left = ids, array("Q")
+            logging.info("Diff %s: kein Snapshot → alle %d Mitglieder", group, len(ids))
+        else:
+            joined, left = sorted_diff(old, ids)
+            logging.info("Diff %s: %d Mitglieder, +%d beigetreten, -%d ausgetreten",
+                         group, len(ids), len(joined), len(left))
+        joined_per_group.append(joined)
+        left_per_group.append(left)
+
+    total_selected = total_ok = total_err = 0
+    clean = True
+    # wer schon in einer anderen Gruppe bekannt war, wurde damals bereits bearbeitet
+    joined, gidx = build_union(joined_per_group)
+    joined, gidx = sorted_minus(joined, gidx, build_union(old_per_group)[0])
+    joined_per_group.clear()
+    old_per_group.clear()
+    logging.info("Diff: %d neue IDs über alle Gruppen", len(joined))
+    if joined:
+        # alle neu → Reihenfolge nur nach Anzahl aktueller Gruppen
+        sel, ok, err = block_union(config, fetched_groups, joined, gidx, cookies, dry_run, mode,
+                                   concurrency, referer_mode, report, tag="Δ+",
+                                   plan=work_plan(config, joined, per_group, None, dry_run))
+        total_selected, total_ok, total_err = sel, ok, err
+        clean = err == 0 and ok >= sel
+
+    if unblock_left:
+        if len(fetched_groups) < len(groups):
+            # ohne vollständige Listen wären Mitglieder fehlender Gruppen fälschlich "ausgetreten"
+            logging.warning("Diff: nicht alle Gruppen geladen → Entsperren Ausgetretener übersprungen")
+        else:
+            current, _ = build_union(per_group)
+            left_all, left_gidx = build_union(left_per_group)
+            gone, gone_gidx = sorted_minus(left_all, left_gidx, current)
+            logging.info("Diff: %d IDs aus allen Gruppen ausgetreten", len(gone))
+            if gone:
+                sel, ok, err = block_union(config, fetched_groups, gone, gone_gidx, cookies, dry_run, "unblock",
+                                           concurrency, referer_mode, report, tag="Δ-")
+                total_selected += sel
+                total_ok += ok
+                total_err += err
+                clean = clean and err == 0 and ok >= sel
+
+    # Snapshots nur fortschreiben, wenn das Delta vollständig bearbeitet wurde (sonst im nächsten Lauf erneut)
+    if dry_run:
+        logging.info("Diff: Dry-Run → Snapshots unverändert")
+    elif not clean:
+        logging.warning("Diff: Fehler beim Bearbeiten → Snapshots unverändert, nächster Lauf wiederholt das Delta")
+    else:
+        for group, ids in zip(fetched_groups, per_group):
+            save_snapshot(config, group, ids)
+    return (total_selected, total_ok, total_err)
+
+# ---------- Mehrere Accounts ----------
+# accounts.toml: [[account]] name, sessionid, steamLoginSecure (optional concurrency)
+def load_accounts(path: Path) -> List[dict]:
+    try:
+        data = load_config(path)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        logging.error("Accounts-Datei nicht lesbar (%s): %s", path, e)
+        return []
+    accounts: List[dict] = []
+    names: set = set()
+    for i, acc in enumerate(data.get("account", []), 1):
+        name = str(acc.get("name") or f"account{i}")
+        if not acc.get("sessionid") or not acc.get("steamLoginSecure"):
+            logging.warning("Account %s ohne sessionid/steamLoginSecure → übersprungen", name)
+            continue
+        if name in names:
+            logging.warning("Account-Name doppelt: %s → übersprungen", name)
+            continue
+        names.add(name)
+        accounts.append({"name": name, "cookies": {"sessionid": str(acc["sessionid"]),
+                                                  "steamLoginSecure": str(acc["steamLoginSecure"])},
+                         "concurrency": acc.get("concurrency")})
+    logging.info("Datei %s → %d Accounts", path.name, len(accounts))
+    return accounts
+
+# Config-Kopie mit eigenem Ledger und eigener Retry-Queue je Account (Erfolg bei A heißt nicht geblockt bei B)
+def account_config(config: dict, name: str) -> dict:
+    cfg = dict(config)
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+    for section, default in (("ledger", "ledger.sqlite3"), ("retry", "retry.sqlite3")):
+        sec_cfg = dict(get_cfg(config, section, {}))
+        path = Path(str(get_cfg(sec_cfg, "path", default)))
+        sec_cfg["path"] = str(path.with_name(f"{path.stem}-{safe}{path.suffix}"))
+        cfg[section] = sec_cfg
+    return cfg
+
+# Mitglieder einmal laden, Vereinigung bilden, dann je Account ein Worker-Prozess mit eigener
+# Session, eigenem RateController und eigenem Breaker
+def process_groups_accounts(config: dict, groups: List[str], max_needed: Optional[int], accounts: List[dict],
+                            dry_run: bool, mode: str, concurrency: int, referer_mode: str,
+                            report: Optional[RunReport] = None) -> Tuple[int,int,int]:
+    general = get_cfg(config, "general", {})
+    group_to = int(get_cfg(general, "group_timeout_seconds", 600))
+    if bool(get_cfg(get_cfg(config, "diff", {}), "enabled", False)):
+        logging.warning("Diff-Modus gilt nicht für mehrere Accounts → volle Liste (Ledger je Account überspringt Erledigtes)")
+
+    fetched_groups, per_group = fetch_groups(config, groups, max_needed, mode, report)
+    union, gidx = build_union(per_group)
+    plan = work_plan(config, union, per_group, snapshot_union(config, fetched_groups), dry_run)
+    per_group.clear()
+    logging.info("Vereinigung: %d Gruppen, %d IDs → %d Accounts", len(fetched_groups), len(union), len(accounts))
+    if not union:
+        return (0, 0, 0)
+
+    union_b, gidx_b = union.tobytes(), gidx.tobytes()
+    plan_b = None if plan is None else plan.tobytes()
+    jobs = [(acc["name"], "block_union_packed",
+             (account_config(config, acc["name"]), fetched_groups, union_b, gidx_b, acc["cookies"], dry_run, mode,
+              int(acc["concurrency"] or concurrency), referer_mode, f"@{acc['name']}", plan_b))
+            for acc in accounts]
+    rule(("BLK" if mode == "block" else "UNBLK"), f"{len(union)} IDs × {len(accounts)} Accounts")
+    job_stats: List[dict] = [{} for _ in jobs]
+    results = run_pool(config, jobs, len(jobs), group_to * max(1, len(fetched_groups)), job_stats, shared_rate=False)
+    total_selected = total_ok = total_err = 0
+    for acc, res, stats in zip(accounts, results, job_stats):
+        if res is None:
+            ckpt = peek_checkpoint(config, union_checkpoint_key(mode, fetched_groups, f"@{acc['name']}"))
+            res = (len(union), ckpt.ok, ckpt.err) if ckpt is not None else (len(union), 0, 0)
+        logging.info("Account %s: sel=%d ok=%d err=%d", acc["name"], *res)
+        if report is not None:
+            report.add_group(f"@{acc['name']}", mode, res, stats)
+        total_selected += res[0]
+        total_ok += res[1]
+        total_err += res[2]
+    return (total_selected, total_ok, total_err)
+
+# ---------- Verteilte Arbeit (Koordinator / Worker) ----------
+# Worker-Schleife (Pool-Prozess): Block leasen, blocken, Ergebnisse melden; ein Heartbeat-Thread verlängert
+# die Leases und meldet Zwischenergebnisse (Absturz → nur seit dem letzten Heartbeat doppelt). Mit job_id nur dieser Job (lokale Worker des Koordinators), sonst jeweils der neueste offene Job,
+# bis distributed.idle_exit_seconds lang nichts zu tun war → (sel, ok, err)
+def work_queue_worker(cfg: dict, name: str, cks: Optional[dict], conc: int, ref: str,
+                      job_id: Optional[int] = None) -> Tuple[int,int,int]:
+    dist_cfg = get_cfg(cfg, "distributed", {})
+    lease_n = int(get_cfg(dist_cfg, "lease_size", 500))
+    hb_s = float(get_cfg(dist_cfg, "heartbeat_seconds", 20.0))
+    poll_s = float(get_cfg(dist_cfg, "poll_seconds", 5.0))
+    idle_s = float(get_cfg(dist_cfg, "idle_exit_seconds", 300.0))
+    wq = open_work_queue(cfg)
+    if wq is None:
+        return (0, 0, 0)
+    owner = f"{name}-{os.getpid()}"
+    leased: List[int] = []      # Job der laufenden Leases (für Heartbeat und Freigabe)
+    results: List[Tuple[int, bool]] = []    # Ergebnisse, noch nicht in der Queue
+    results_lock = threading.Lock()
+    stop = threading.Event()
+
+    def report_results(jid: int) -> None:
+        with results_lock:
+            batch = results[:]
+            results.clear()
+        wq.complete(jid, owner, batch)
+
+    def heartbeat() -> None:
+        while not stop.wait(hb_s):
+            if leased:
+                try:
+                    report_results(leased[0])
+                    wq.heartbeat(leased[0], owner)
+                except sqlite3.Error as e:
+                    logging.warning("Work-Queue-Heartbeat fehlgeschlagen: %s", e)
+
+    hb = threading.Thread(target=heartbeat, name="wq-heartbeat", daemon=True)
+    hb.start()
+    ledger = open_ledger(cfg)
+    profile_prefix = f"{steam_base_url(cfg)}/profiles/"
+    total_selected = total_ok = total_err = 0
+    batches = 0
+    idle_since = time.monotonic()
+    try:
+        while True:
+            job = wq.job(job_id)
+            rows = wq.lease(job[0], owner, lease_n) if job is not None and not job[3] else []
+            if not rows:
+                if job_id is not None and (job is None or job[3] or not wq.open_items(job_id)):
+                    break
+                if job_id is None and time.monotonic() - idle_since > idle_s:
+                    logging.info("Work-Queue: %ds ohne Arbeit → Worker %s beendet", idle_s, owner)
+                    break
+                time.sleep(poll_s)
+                continue
+            jid, mode, groups, _closed = job
+            leased[:] = [jid]
+            batches += 1
+            seq_of = {sid: seq for seq, sid, _gi in rows}
+            gi_of = {sid: gi for _seq, sid, gi in rows}
+            referers = [None if is_id_source(g) else g for g in groups]
+
+            def referer_of(steamid: int) -> str:
+                return referers[gi_of[steamid]] or f"{profile_prefix}{steamid}"
+
+            def on_result(sid: int, success: bool) -> None:
+                with results_lock:
+                    results.append((seq_of[sid], success))
+
+            sel, ok, err = _block_selected(cfg, f"⇄ {owner} #{batches}", array("Q", (sid for _s, sid, _g in rows)),
+                                           0, cks, False, mode, conc, ref, ledger,
+                                           referer_of if ref == "group" else None, on_result=on_result)
+            leased.clear()
+            report_results(jid)
+            if ok + err < len(rows):
+                # Breaker-Abbruch: Rest sofort zurückgeben, andere Worker übernehmen
+                logging.warning("Work-Queue: %d IDs unbearbeitet → freigegeben, Worker %s beendet",
+                                len(rows) - ok - err, owner)
+                wq.release(jid, owner)
+                break
+            total_selected += sel
+            total_ok += ok
+            total_err += err
+            idle_since = time.monotonic()
+    finally:
+        stop.set()
+        if leased:
+            try:
+                report_results(leased[0])
+                wq.release(leased[0], owner)
+            except sqlite3.Error as e:
+                logging.warning("Work-Queue: Leases nicht freigegeben (laufen ab): %s", e)
+        hb.join(1)
+        if ledger is not None:
+            ledger.close()
+        wq.close()
+    return (total_selected, total_ok, total_err)
+
+# distributed.workers Worker-Prozesse auf dieser Maschine (gemeinsames Ratenbudget, Sammelanzeige)
+def run_work_queue_workers(config: dict, cookies: Optional[dict], concurrency: int, referer_mode: str,
+                           job_id: Optional[int] = None, timeout_s: float = float("inf"),
+                           n_workers: Optional[int] = None) -> Tuple[int,int,int]:
+    dist_cfg = get_cfg(config, "distributed", {})
+    n = int(get_cfg(dist_cfg, "workers", 2)) if n_workers is None else n_workers
+    host = socket.gethostname()
+    jobs = [(f"⇄ {host}-{i}", "work_queue_worker", (config, f"{host}-{i}", cookies, concurrency, referer_mode, job_id))
+            for i in range(max(1, n))]
+    total_selected = total_ok = total_err = 0
+    for res in run_pool(config, jobs, len(jobs), timeout_s):
+        if res is not None:
+            total_selected += res[0]
+            total_ok += res[1]
+            total_err += res[2]
+    return (total_selected, total_ok, total_err)
+
+# Auf externe Worker warten, bis der Job abgearbeitet ist (oder deadline) → Anzahl offener IDs
+def wait_for_job(config: dict, wq: WorkQueue, job: int, mode: str, deadline: float) -> int:
+    poll_s = float(get_cfg(get_cfg(config, "distributed", {}), "poll_seconds", 5.0))
+    total = wq.total(job)
+    with make_progress() as progress:
+        task = progress.add_task("Gesamt", total=total, mode=("BLK" if mode == "block" else "UNBLK"),
+                                 group_short=f"⇄ Job {job}", pages="-", total_pages="-", ids=total,
+                                 ok=0, err=0, rate="-", inflight="-")
+        while True:
+            counts = wq.counts(job)
+            n_open = counts[WorkQueue.PENDING] + counts[WorkQueue.LEASED]
+            progress.update(task, completed=total - n_open, ok=counts[WorkQueue.OK],
+                            err=counts[WorkQueue.FAILED] + counts[WorkQueue.ABANDONED],
+                            inflight=counts[WorkQueue.LEASED])
+            if not n_open or time.time() >= deadline:
+                return n_open
+            # abgelaufene Leases auch ohne lokale Worker zurückholen
+            wq.reclaim(job)
+            time.sleep(poll_s)
+
+# Koordinator: Mitglieder laden, Vereinigung + Arbeitsplan bilden und (ohne Ledger-Erledigtes) als Job in die
+# Work-Queue legen; lokale Worker (distributed.workers) und "--worker"-Prozesse anderer Rechner arbeiten ihn ab.
+# Am Ende wandern die Erfolge ins eigene Ledger, die Worker erscheinen einzeln im Bericht.
+def process_groups_distributed(config: dict, groups: List[str], max_needed: Optional[int], cookies: Optional[dict],
+                               dry_run: bool, mode: str, concurrency: int, referer_mode: str,
+                               report: Optional[RunReport] = None) -> Tuple[int,int,int]:
+    general = get_cfg(config, "general", {})
+    group_to = int(get_cfg(general, "group_timeout_seconds", 600))
+    if bool(get_cfg(get_cfg(config, "diff", {}), "enabled", False)):
+        logging.warning("Diff-Modus gilt nicht für den Koordinator → volle Liste (Ledger überspringt Erledigtes)")
+
+    fetched_groups, per_group = fetch_groups(config, groups, max_needed, mode, report)
+    union, gidx = build_union(per_group)
+    plan = work_plan(config, union, per_group, snapshot_union(config, fetched_groups), dry_run)
+    per_group.clear()
+    if not union:
+        return (0, 0, 0)
+    selected = plan if plan is not None else union
+    ledger = open_ledger(config)
+    if ledger is not None:
+        before = len(selected)
+        selected = ledger.filter_new(selected, mode)
+        logging.info("Ledger: %d bereits erledigt, %d neu", before - len(selected), len(selected))
+    if dry_run or not selected:
+        if dry_run:
+            logging.info("Dry-Run: %d IDs würden über die Work-Queue verteilt", len(selected))
+        if ledger is not None:
+            ledger.close()
+        return (len(selected), 0, 0)
+
+    wq = open_work_queue(config)
+    if wq is None:
+        if ledger is not None:
+            ledger.close()
+        logging.warning("Work-Queue nicht nutzbar → lokal blocken")
+        return block_union(config, fetched_groups, union, gidx, cookies, dry_run, mode, concurrency,
+                           referer_mode, report, plan=plan)
+    try:
+        key = union_checkpoint_key(mode, fetched_groups, "⇄")
+        job = wq.open_job(key) if bool(get_cfg(general, "resume", False)) else None
+        if job is not None:
+            logging.info("Work-Queue %s: offener Job %d wird fortgesetzt (%d offen)", wq.path, job, wq.open_items(job))
+        else:
+            gis = array("H", (gidx[bisect_left(union, sid)] for sid in selected))
+            job = wq.create_job(mode, fetched_groups, key, selected, gis)
+            logging.info("Work-Queue %s: Job %d mit %d IDs angelegt", wq.path, job, len(selected))
+        del union, gidx, plan, selected
+
+        deadline = time.time() + group_to * max(1, len(fetched_groups))
+        n_local = int(get_cfg(get_cfg(config, "distributed", {}), "workers", 2))
+        if n_local > 0:
+            rule(("BLK" if mode == "block" else "UNBLK"), f"⇄ Job {job}: {n_local} lokale Worker")
+            run_work_queue_workers(config, cookies, concurrency, referer_mode, job, max(1.0, deadline - time.time()))
+        n_open = wait_for_job(config, wq, job, mode, deadline)
+
+        counts = wq.counts(job)
+        ok, err = counts[WorkQueue.OK], counts[WorkQueue.FAILED] + counts[WorkQueue.ABANDONED]
+        if ledger is not None:
+            for sid in wq.ids(job, WorkQueue.OK):
+                ledger.record(sid, mode, True)
+        for name, host, _last_seen, w_ok, w_err in wq.workers(job):
+            logging.info("Worker %s (%s): ok=%d err=%d", name, host, w_ok, w_err)
+            if report is not None:
+                report.add_group(f"⇄ {name}", mode, (w_ok + w_err, w_ok, w_err), {})
+        if counts[WorkQueue.ABANDONED]:
+            logging.warning("Work-Queue: %d IDs nach %d abgelaufenen Leases aufgegeben",
+                            counts[WorkQueue.ABANDONED], wq.max_attempts)
+        if n_open:
+            logging.warning("Work-Queue: Zeitlimit erreicht, %d IDs offen → Job %d bleibt offen (--resume setzt fort)",
+                            n_open, job)
+        else:
+            wq.close_job(job)
+        return (wq.total(job), ok, err)
+    finally:
+        wq.close()
+        if ledger is not None:
+            ledger.close()
+
+# ---------- Export ----------
+# Nur laden, nicht blocken: Mitgliederlisten je Gruppe als Datei + groups.txt mit den Dateinamen,
+# damit mehrere Block-Läufe (z. B. verschiedene Accounts) dieselben Listen ohne erneuten Download nutzen
+def export_groups(config: dict, groups: List[str], max_needed: Optional[int], mode: str,
+                  directory: Path, fmt: str) -> int:
+    fmt = fmt.lower().lstrip(".")
+    if fmt not in ("u64", "ndjson"):
+        logging.error("Ungültiges export.format: %s (u64 oder ndjson)", fmt)
+        return 0
+    directory.mkdir(parents=True, exist_ok=True)
+    fetched_groups, per_group = fetch_groups(config, groups, max_needed, mode)
+    manifest: List[str] = []
+    for group, ids in zip(fetched_groups, per_group):
+        ids = ids if _is_sorted(ids) else unique_ids(ids)
+        name = export_name(group, fmt)
+        try:
+            write_id_file(directory / name, ids, group)
+        except OSError as e:
+            logging.error("Export fehlgeschlagen (%s): %s", name, e)
+            continue
+        logging.info("Export %s: %d IDs → %s", group, len(ids), name)
+        manifest += [f"# {group}", name]
+    (directory / "groups.txt").write_text("\n".join(manifest) + "\n", encoding="utf-8")
+    logging.info("Export: %d/%d Gruppen nach %s (als general.groups_file nutzbar)",
+                 len(manifest) // 2, len(groups), directory / "groups.txt")
+    return len(manifest) // 2
+
+# ---------- Retry-Queue abarbeiten ----------
+# Fällige IDs der Retry-Queue blocken (im Worker-Prozess) → (sel, ok, err)
+def block_due_retries(cfg: dict, cks: Optional[dict], md: str, conc: int, ref: str) -> Tuple[int,int,int]:
+    retryq = open_retry_queue(cfg)
+    if retryq is None:
+        return (0, 0, 0)
+    try:
+        ids, refs = retryq.due(md)
+    finally:
+        retryq.close()
+    if not ids:
+        return (0, 0, 0)
+    profile_prefix = f"{steam_base_url(cfg)}/profiles/"
+
+    def referer_of(steamid: int) -> str:
+        return refs.get(steamid) or f"{profile_prefix}{steamid}"
+
+    ledger = open_ledger(cfg)
+    try:
+        return _block_selected(cfg, "↻ Retry-Queue", ids, 0, cks, False, md, conc, ref, ledger,
+                               referer_of if ref == "group" else None)
+    finally:
+        if ledger is not None:
+            ledger.close()
+
+def retry_drain_entry(q: mp.Queue, cfg: dict, cks: Optional[dict], md: str, conc: int, ref: str):
+    try:
+        with profiled(cfg, "retry"):
+            res = block_due_retries(cfg, cks, md, conc, ref)
+    except Exception as e:
+        logging.error("Retry worker exception: %s", e)
+        res = (0, 0, 0)
+    try:
+        q.put((res, worker_stats()))
+    except Exception:
+        pass
+
+# Am Laufende: Fälliges wiederholen, auf bald Fälliges bis retry.drain_wait_seconds warten;
+# der Rest bleibt für den nächsten Aufruf. Aufgegebene IDs landen im Bericht.
+def drain_retry_queue(config: dict, cookies: Optional[dict], dry_run: bool, mode: str, concurrency: int,
+                      referer_mode: str, report: Optional[RunReport] = None, account: str = "") -> Tuple[int,int,int]:
+    retryq = open_retry_queue(config)
+    if retryq is None:
+        return (0, 0, 0)
+    retry_cfg = get_cfg(config, "retry", {})
+    group_to = int(get_cfg(get_cfg(config, "general", {}), "group_timeout_seconds", 600))
+    deadline = time.time() + float(get_cfg(retry_cfg, "drain_wait_seconds", 60.0))
+    label = f"Retry-Queue{' @' + account if account else ''}"
+    total_selected = total_ok = total_err = 0
+    try:
+        if dry_run or cookies is None:
+            logging.info("%s: %d IDs offen (Dry-Run → nicht wiederholt)", label, retryq.pending(mode))
+        else:
+            while True:
+                next_ts = retryq.next_due(mode)
+                if next_ts is None or next_ts > deadline:
+                    break
+                if next_ts > time.time():
+                    logging.info("%s: nächste Wiederholung in %.0fs", label, next_ts - time.time())
+                    time.sleep(max(0.0, next_ts - time.time()))
+                rule(("BLK" if mode == "block" else "UNBLK"), f"↻ {label}")
+                before = dict(RUN_STATS)
+                res = run_with_watchdog(retry_drain_entry, (config, cookies, mode, concurrency, referer_mode),
+                                        group_to, label, None) or (0, 0, 0)
+                if report is not None:
+                    report.add_group(f"↻ {label}", mode, res, stats_delta(before, RUN_STATS))
+                total_selected += res[0]
+                total_ok += res[1]
+                total_err += res[2]
+                if res[0] == 0:
+                    break
+            pending = retryq.pending(mode)
+            if pending:
+                logging.info("%s: %d IDs offen → nächster Aufruf", label, pending)
+        given_up = retryq.take_given_up(mode)
+    finally:
+        retryq.close()
+    if total_selected:
+        logging.info("%s: sel=%d ok=%d err=%d", label, total_selected, total_ok, total_err)
+    if given_up:
+        logging.warning("%s: %d IDs nach %d Versuchen aufgegeben: %s%s", label, len(given_up),
+                        int(get_cfg(retry_cfg, "max_attempts", 5)),
+                        ", ".join(str(sid) for sid, _ in given_up[:10]), " …" if len(given_up) > 10 else "")
+        if report is not None:
+            report.add_given_up(given_up, account)
+    return (total_selected, total_ok, total_err)
+
+# ---------- Hauptablauf ----------
+def log_summary(selected: int, ok: int, err: int) -> None:
+    publish_pool_stats()
+    logging.info("Fertig: sel=%d ok=%d err=%d cache_hit=%d cache_miss=%d verbindungen=%d/%d requests",
+                 selected, ok, err, RUN_STATS["cache_hit"], RUN_STATS["cache_miss"],
+                 RUN_STATS["conn_opened"], RUN_STATS["conn_requests"])
+
+def process_groups(config: dict, groups: Iterable[str], max_per_group: int,
+                   sessionid: Optional[str], steam_login_secure: Optional[str],
+                   dry_run: bool, mode: str, concurrency: int, referer_mode: str,
+                   accounts: Optional[List[dict]] = None) -> None:
+    total_selected = total_ok = total_err = 0
+    general = get_cfg(config, "general", {})
+    need = (max_per_group if max_per_group > 0 else None)
+    report = RunReport(config)
+    if profile_on(config):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(report.started))
+        os.environ["SGB_PROFILE_DIR"] = str((report.directory / f"run-{stamp}-profile").resolve())
+    if accounts:
+        total_selected, total_ok, total_err = process_groups_accounts(
+            config, list(groups), need, accounts, dry_run, mode, concurrency, referer_mode, report,
+        )
+        for acc in accounts:
+            res = drain_retry_queue(account_config(config, acc["name"]), acc["cookies"], dry_run, mode,
+                                    int(acc["concurrency"] or concurrency), referer_mode, report, acc["name"])
+            total_selected += res[0]
+            total_ok += res[1]
+            total_err += res[2]
+        log_summary(total_selected, total_ok, total_err)
+        report.write(total_selected, total_ok, total_err)
+        profile_summary(config)
+        return
+
+    cookies = {"sessionid": sessionid, "steamLoginSecure": steam_login_secure} if (sessionid and steam_login_secure) else None
+    if cookies is None:
+        dry_run = True
+        logging.warning("Keine Cookies → DRY RUN")
+
+    n_parallel = int(get_cfg(general, "parallel_groups", 1))
+    if bool(get_cfg(general, "coordinator", False)):
+        total_selected, total_ok, total_err = process_groups_distributed(
+            config, list(groups), need, cookies, dry_run, mode, concurrency, referer_mode, report,
+        )
+    elif bool(get_cfg(get_cfg(config, "diff", {}), "enabled", False)):
+        total_selected, total_ok, total_err = process_groups_diff(
+            config, list(groups), need, cookies, dry_run, mode, concurrency, referer_mode, report,
+        )
+    elif bool(get_cfg(general, "dedup_across_groups", False)):
+        total_selected, total_ok, total_err = process_groups_union(
+            config, list(groups), need, cookies, dry_run, mode, concurrency, referer_mode, report,
+        )
+    elif n_parallel > 1:
+        groups = list(groups)
+        group_to = int(get_cfg(general, "group_timeout_seconds", 600))
+        rule(("BLK" if mode == "block" else "UNBLK"), f"{len(groups)} Gruppen ({n_parallel} parallel)")
+        jobs = [(g, "run_group_with_single_progress", (config, g, need, cookies, dry_run, mode, concurrency, referer_mode))
+                for g in groups]
+        job_stats: List[dict] = [{} for _ in jobs]
+        for group, res, stats in zip(groups, run_pool(config, jobs, n_parallel, group_to, job_stats), job_stats):
+            if res is None:
+                ckpt = peek_checkpoint(config, f"{mode}|{group}")
+                res = (ckpt.selected, ckpt.ok, ckpt.err) if ckpt is not None else (0, 0, 0)
+            report.add_group(group, mode, res, stats)
+            total_selected += res[0]
+            total_ok += res[1]
+            total_err += res[2]
+    else:
+        for group in groups:
+            rule(("BLK" if mode == "block" else "UNBLK"), f"{group}")
+            before = dict(RUN_STATS)
+            selected, ok, err = run_group_with_watchdog(
+                config=config,
+                group=group,
+                max_needed=need,
+                cookies=cookies,
+                dry_run=dry_run,
+                mode=mode,
+                concurrency=concurrency,
+                referer_mode=referer_mode,
+            )
+            report.add_group(group, mode, (selected, ok, err), stats_delta(before, RUN_STATS))
+            total_selected += selected
+            total_ok += ok
+            total_err += err
+
+    # Wiederholungen erst nach dem Hauptlauf, damit sie ihn nicht aufhalten (eigene Zeile im Bericht)
+    res = drain_retry_queue(config, cookies, dry_run, mode, concurrency, referer_mode, report)
+    total_selected += res[0]
+    total_ok += res[1]
+    total_err += res[2]
+    log_summary(total_selected, total_ok, total_err)
+    report.write(total_selected, total_ok, total_err)
+    profile_summary(config)
+
+# ---------- Main ----------
+def main():
+    ap = argparse.ArgumentParser(description="Steam Group Members Blocker")
+    ap.add_argument("--resume", action="store_true",
+                    help="abgebrochenen Lauf anhand der Checkpoints fortsetzen")
+    ap.add_argument("--export", metavar="DIR", default=None,
+                    help="nur Mitgliederlisten laden und als Dateien in DIR speichern (kein Blocken)")
+    ap.add_argument("--plain", action="store_true",
+                    help="Ausgabe ohne rich (Zeilen statt Fortschrittsbalken, z. B. für Cron)")
+    ap.add_argument("--coordinator", action="store_true",
+                    help="IDs in die Work-Queue (distributed.path) legen und von Workern abarbeiten lassen")
+    ap.add_argument("--worker", action="store_true",
+                    help="nur Work-Queue abarbeiten (keine Gruppenliste nötig), z. B. auf weiteren Rechnern")
+    args = ap.parse_args()
+
+    config_path = Path(os.getenv("CONFIG_PATH", "config.toml")).resolve()
+    cfg = load_config(config_path)
+
+    general = cfg.setdefault("general", {})
+    general["resume"] = bool(args.resume)
+    general["coordinator"] = bool(args.coordinator)
+    log_level = str(get_cfg(general, "log_level", "INFO")).upper()
+
+    # Ausgabemodus vor dem ersten rich-Zugriff festlegen (Env → auch für Worker-Prozesse)
+    if args.plain:
+        os.environ["SGB_OUTPUT"] = "plain"
+    os.environ.setdefault("SGB_OUTPUT", str(get_cfg(general, "output", "auto")).lower())
+    os.environ.setdefault("SGB_PROGRESS_INTERVAL", str(float(get_cfg(general, "progress_interval_seconds", 10.0))))
+
+    FORMAT = "%(message)s"
+    if output_mode() == "plain":
+        logging.basicConfig(
+            level=getattr(logging, log_level, logging.INFO),
+            format="%(asctime)s %(levelname)s %(message)s",
+            datefmt="%H:%M:%S",
+        )
+    else:
+        from rich.logging import RichHandler
+        logging.basicConfig(
+            level=getattr(logging, log_level, logging.INFO),
+            format=FORMAT,
+            datefmt="[%X]",
+            handlers=[RichHandler(console=get_console(), markup=True, rich_tracebacks=True)],
+        )
+
+    # urllib3-Logs dämpfen (Pool-Warnungen unterdrücken)
+    http_cfg = get_cfg(cfg, "http", {})
+    quiet_urllib3_logging(http_cfg)
+
+    groups: List[str] = []
+    # Worker brauchen keine Gruppenliste: IDs und Referer kommen aus der Work-Queue
+    if not args.worker:
+        groups_file = get_cfg(general, "groups_file", None)
+        group_url = get_cfg(general, "group_url", None)
+        if groups_file:
+            p = Path(groups_file).expanduser().resolve()
+            if not p.exists():
+                logging.error("groups file not found: %s", p)
+                sys.exit(2)
+            groups.extend(read_groups_file(p))
+        if group_url:
+            groups.append(group_url)
+        if not groups:
+            logging.error("Konfiguration ohne Gruppen; setze general.groups_file oder general.group_url")
+            sys.exit(2)
+        groups = preflight_groups(cfg, groups)
+        if not groups:
+            logging.error("Preflight: keine gültige Gruppe übrig")
+            sys.exit(2)
+
+    max_per_group = int(get_cfg(general, "max_per_group", 0))
+    dry_run = bool(get_cfg(general, "dry_run", False))
+
+    if args.export:
+        export_cfg = get_cfg(cfg, "export", {})
+        block_mode = str(get_cfg(get_cfg(cfg, "block", {}), "mode", "block")).lower()
+        n = export_groups(cfg, groups, (max_per_group if max_per_group > 0 else None), block_mode,
+                          Path(args.export).expanduser().resolve(), str(get_cfg(export_cfg, "format", "u64")))
+        sys.exit(0 if n else 1)
+
+    accounts: List[dict] = []
+    accounts_file = get_cfg(general, "accounts_file", None)
+    if accounts_file:
+        accounts = load_accounts(Path(accounts_file).expanduser().resolve())
+        if not accounts:
+            logging.error("Keine gültigen Accounts in %s", accounts_file)
+            sys.exit(2)
+
+    cookies_cfg = get_cfg(cfg, "cookies", {})
+    use_env = bool(get_cfg(cookies_cfg, "use_env", True))
+    sessionid = os.getenv("SESSIONID") if use_env else get_cfg(cookies_cfg, "sessionid", None)
+    steam_login_secure = os.getenv("STEAMLOGINSECURE") if use_env else get_cfg(cookies_cfg, "steamLoginSecure", None)
+    if not accounts and (not sessionid or not steam_login_secure):
+        logging.warning("Cookies fehlen → DRY RUN")
         dry_run = True
 
     block_cfg = get_cfg(cfg, "block", {})
@@ -615,6 +4076,22 @@ def main():
     if referer_mode not in ("profile", "group"):
         referer_mode = "profile"
 
+    if args.worker:
+        if not sessionid or not steam_login_secure:
+            logging.error("Worker ohne Cookies → Abbruch")
+            sys.exit(2)
+        cookies = {"sessionid": sessionid, "steamLoginSecure": steam_login_secure}
+        res = run_work_queue_workers(cfg, cookies, concurrency, referer_mode)
+        drained = drain_retry_queue(cfg, cookies, False, mode, concurrency, referer_mode)
+        log_summary(*(a + b for a, b in zip(res, drained)))
+        sys.exit(0)
+    if args.coordinator and accounts:
+        logging.error("--coordinator und accounts_file sind nicht kombinierbar")
+        sys.exit(2)
+
+    if not args.resume:
+        clear_checkpoints(cfg)
+
     process_groups(
         config=cfg,
         groups=groups,
@@ -625,6 +4102,7 @@ def main():
         mode=mode,
         concurrency=concurrency,
         referer_mode=referer_mode,
+        accounts=accounts,
     )
 
 if __name__ == "__main__":